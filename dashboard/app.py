@@ -8,13 +8,19 @@ import sys
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.data_loader import load_data, get_date_range
-from src.kpi_calculator import calculate_kpis, summarize_kpis, top_products_by_revenue
+from src.costs import COST_TABLE_PATH
+from src.currency import BASE_CURRENCY, FX_RATES_PATH, available_currencies, convert_currency
+from src.data_loader import load_enriched, get_date_range, resolve_data_path, source_mtime
+from src.partitions import filter_date_range, is_partitioned, read_manifest
+from src.kpi_calculator import summarize_kpis, top_products_by_revenue
+from src.rollup import rollup
+from src.ingest import kpi_histograms_mtime
+from src.histograms import BIN_EDGES, combine, histogram_frame, load_histograms, quantiles, select_cells
+from src.output_writer import PROCESSED_DIR
 
 # ── Page Configuration ──────────────────────────────────────────────────────
 st.set_page_config(
@@ -53,31 +59,90 @@ st.markdown(
 
 
 # ── Data Loading ────────────────────────────────────────────────────────────
-@st.cache_data
-def get_data():
-    """Load and process sales data."""
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
+def _mtime_or_none(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def data_version():
+    """
+    Identify the data every cached loader reads.
+
+    Passed to each cached function, so the first ingest (the raw CSV giving
+    way to the store) and every later one refresh the dashboard.
+    """
+    data_path = resolve_data_path()
+    return (
+        data_path,
+        source_mtime(data_path),
+        kpi_histograms_mtime(),
+        _mtime_or_none(COST_TABLE_PATH),
+        _mtime_or_none(FX_RATES_PATH),
     )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
-    return df
 
 
-df = get_data()
+@st.cache_data
+def get_data(version, start=None, end=None):
+    """
+    Load and process sales data for a date range.
+
+    With a partitioned store only the overlapping months are read; a plain
+    CSV is loaded once and filtered in memory.
+    """
+    data_path = resolve_data_path()
+    if not is_partitioned(data_path) and (start is not None or end is not None):
+        return filter_date_range(get_data(version), start, end)
+    return load_enriched(data_path, start=start, end=end)
+
+
+@st.cache_data
+def get_report_data(version, start=None, end=None, currency=BASE_CURRENCY):
+    """
+    Sales data for a date range in a reporting currency.
+
+    Builds on the cached base-currency rows, so switching currency costs one
+    rate lookup per date rather than another FX join.
+    """
+    return convert_currency(get_data(version, start, end), currency)
+
+
+@st.cache_data
+def get_histograms(version):
+    """Per-cell KPI histograms; any selection is answered by summing bins."""
+    return load_histograms()
+
+
+@st.cache_data
+def get_date_bounds(version):
+    """First and last available date, from the manifest when partitioned."""
+    data_path = resolve_data_path()
+    if is_partitioned(data_path):
+        manifest = read_manifest(data_path)
+        return manifest["min_date"].min().date(), manifest["max_date"].max().date()
+    min_date, max_date = get_date_range(get_data(version))
+    return min_date.date(), max_date.date()
+
 
 # ── Sidebar Filters ─────────────────────────────────────────────────────────
 st.sidebar.title("🔍 Filters")
 
 # Date range filter
-min_date = df["date"].min().date()
-max_date = df["date"].max().date()
+version = data_version()
+min_date, max_date = get_date_bounds(version)
 date_range = st.sidebar.date_input(
     "Date Range",
     value=(min_date, max_date),
     min_value=min_date,
     max_value=max_date,
 )
+# Reporting currency
+currency = st.sidebar.selectbox("Currency", available_currencies())
+money = "$" if currency == BASE_CURRENCY else f"{currency} "
+unit = "$" if currency == BASE_CURRENCY else currency
+
+if len(date_range) == 2:
+    df = get_report_data(version, pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]), currency)
+else:
+    df = get_report_data(version, currency=currency)
 
 # Region filter
 regions = ["All"] + sorted(df["region"].unique().tolist())
@@ -87,18 +152,31 @@ selected_region = st.sidebar.selectbox("Region", regions)
 products = ["All"] + sorted(df["product_name"].unique().tolist())
 selected_product = st.sidebar.selectbox("Product", products)
 
-# Apply filters
+# Apply filters (the date range was applied when loading)
 filtered = df.copy()
-if len(date_range) == 2:
-    filtered = filtered[
-        (filtered["date"].dt.date >= date_range[0])
-        & (filtered["date"].dt.date <= date_range[1])
-    ]
 if selected_region != "All":
     filtered = filtered[filtered["region"] == selected_region]
 if selected_product != "All":
     filtered = filtered[filtered["product_name"] == selected_product]
 
+# Precomputed tables are keyed by product_id rather than name.
+selected_product_ids = None
+if selected_product != "All":
+    selected_product_ids = df.loc[df["product_name"] == selected_product, "product_id"].unique()
+
+# All chart aggregates come from one pass over the filtered rows.
+levels = rollup(
+    filtered,
+    [
+        ("month", "region"),
+        ("region",),
+        ("product_name",),
+        ("region", "product_name"),
+        ("year", "month_num"),
+        (),
+    ],
+)
+
 # ── Header ──────────────────────────────────────────────────────────────────
 st.title("📊 Sales Performance Dashboard")
 st.markdown("Interactive analysis of sales data across regions and products.")
@@ -109,29 +187,23 @@ summary = summarize_kpis(filtered)
 
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    st.metric("💰 Total Revenue", f"${summary['total_revenue']:,.2f}")
+    st.metric("💰 Total Revenue", f"{money}{summary['total_revenue']:,.2f}")
 with col2:
     st.metric("📦 Total Orders", f"{summary['total_orders']:,}")
 with col3:
     st.metric("📈 Avg Conversion", f"{summary['avg_conversion_rate']:.2f}%")
 with col4:
-    st.metric("🛒 Avg Order Value", f"${summary['avg_order_value']:,.2f}")
+    st.metric("🛒 Avg Order Value", f"{money}{summary['avg_order_value']:,.2f}")
 with col5:
-    est_profit = filtered["estimated_profit"].sum() if "estimated_profit" in filtered.columns else 0
-    st.metric("💎 Est. Profit", f"${est_profit:,.2f}")
+    est_profit = levels[()]["estimated_profit"].iloc[0] if "estimated_profit" in filtered.columns else 0
+    st.metric("💎 Est. Profit", f"{money}{est_profit:,.2f}")
 
 st.markdown("---")
 
 # ── Revenue Over Time ──────────────────────────────────────────────────────
 st.subheader("📈 Revenue Trends")
 
-monthly = filtered.copy()
-monthly["month"] = monthly["date"].dt.to_period("M").astype(str)
-monthly_agg = (
-    monthly.groupby(["month", "region"])
-    .agg(revenue=("revenue", "sum"), orders=("orders", "sum"))
-    .reset_index()
-)
+monthly_agg = levels[("month", "region")][["month", "region", "revenue", "orders"]]
 
 fig_revenue = px.line(
     monthly_agg,
@@ -139,7 +211,7 @@ fig_revenue = px.line(
     y="revenue",
     color="region",
     title="Monthly Revenue by Region",
-    labels={"month": "Month", "revenue": "Revenue ($)", "region": "Region"},
+    labels={"month": "Month", "revenue": f"Revenue ({unit})", "region": "Region"},
     markers=True,
 )
 fig_revenue.update_layout(
@@ -155,15 +227,8 @@ col_left, col_right = st.columns(2)
 
 with col_left:
     st.subheader("🌎 Regional Performance")
-    regional = (
-        filtered.groupby("region")
-        .agg(
-            revenue=("revenue", "sum"),
-            orders=("orders", "sum"),
-            avg_conversion=("conversion_rate", "mean"),
-        )
-        .reset_index()
-    )
+    regional = levels[("region",)].rename(columns={"conversion_rate": "avg_conversion"})
+    regional = regional[["region", "revenue", "orders", "avg_conversion"]]
     regional["avg_conversion"] = (regional["avg_conversion"] * 100).round(2)
 
     fig_region = px.bar(
@@ -172,7 +237,7 @@ with col_left:
         y="revenue",
         color="region",
         title="Revenue by Region",
-        labels={"revenue": "Revenue ($)", "region": "Region"},
+        labels={"revenue": f"Revenue ({unit})", "region": "Region"},
         color_discrete_sequence=px.colors.qualitative.Set2,
     )
     fig_region.update_layout(
@@ -185,9 +250,7 @@ with col_left:
 with col_right:
     st.subheader("📦 Top Products by Revenue")
     product_rev = (
-        filtered.groupby("product_name")
-        .agg(revenue=("revenue", "sum"), orders=("orders", "sum"))
-        .reset_index()
+        levels[("product_name",)][["product_name", "revenue", "orders"]]
         .sort_values("revenue", ascending=True)
         .tail(10)
     )
@@ -198,7 +261,7 @@ with col_right:
         y="product_name",
         orientation="h",
         title="Top 10 Products",
-        labels={"revenue": "Revenue ($)", "product_name": "Product"},
+        labels={"revenue": f"Revenue ({unit})", "product_name": "Product"},
         color="revenue",
         color_continuous_scale="Viridis",
     )
@@ -213,15 +276,9 @@ with col_right:
 # ── Conversion Rate & Order Value Scatter ──────────────────────────────────
 st.subheader("🔄 Conversion Rate vs Average Order Value")
 
-scatter_data = (
-    filtered.groupby(["region", "product_name"])
-    .agg(
-        conversion_rate=("conversion_rate", "mean"),
-        avg_order_value=("average_order_value", "mean"),
-        total_orders=("orders", "sum"),
-    )
-    .reset_index()
-)
+scatter_data = levels[("region", "product_name")].rename(
+    columns={"average_order_value": "avg_order_value", "orders": "total_orders"}
+)[["region", "product_name", "conversion_rate", "avg_order_value", "total_orders"]]
 
 fig_scatter = px.scatter(
     scatter_data,
@@ -233,7 +290,7 @@ fig_scatter = px.scatter(
     title="Conversion Rate vs AOV (bubble size = order volume)",
     labels={
         "conversion_rate": "Conversion Rate",
-        "avg_order_value": "Avg Order Value ($)",
+        "avg_order_value": f"Avg Order Value ({unit})",
     },
 )
 fig_scatter.update_layout(
@@ -242,18 +299,65 @@ fig_scatter.update_layout(
 )
 st.plotly_chart(fig_scatter, use_container_width=True)
 
-# ── Monthly Orders Heatmap ──────────────────────────────────────────────────
-st.subheader("🗓️ Orders Heatmap")
+# ── KPI Distributions ───────────────────────────────────────────────────────
+st.subheader("📊 KPI Distributions")
 
-heatmap_data = filtered.copy()
-heatmap_data["month_num"] = heatmap_data["date"].dt.month
-heatmap_data["year"] = heatmap_data["date"].dt.year
+metric_labels = {
+    "average_order_value": "Avg Order Value ($)",
+    "conversion_rate": "Conversion Rate",
+    "revenue_per_visitor": "Revenue per Visitor ($)",
+}
+dist_metric = st.selectbox(
+    "Metric", list(metric_labels), format_func=metric_labels.get, key="dist_metric"
+)
 
-heat_agg = (
-    heatmap_data.groupby(["year", "month_num"])
-    .agg(orders=("orders", "sum"))
-    .reset_index()
+cells = select_cells(
+    get_histograms(version),
+    start=pd.Timestamp(date_range[0]) if len(date_range) == 2 else None,
+    end=pd.Timestamp(date_range[1]) if len(date_range) == 2 else None,
+    regions=None if selected_region == "All" else [selected_region],
+    product_ids=selected_product_ids,
 )
+edges = BIN_EDGES[dist_metric]
+counts = combine(cells, dist_metric)
+
+if currency != BASE_CURRENCY:
+    st.caption(f"Distributions are precomputed in {BASE_CURRENCY}.")
+
+if counts.sum() == 0:
+    st.info("No transactions for the current filters.")
+else:
+    p10, p25, p50, p75, p90 = quantiles(counts, edges)
+    is_money = dist_metric != "conversion_rate"
+    fmt = (lambda v: f"${v:,.2f}") if is_money else (lambda v: f"{v:.2%}")
+
+    for col, (label, value) in zip(
+        st.columns(5),
+        [("P10", p10), ("P25", p25), ("Median", p50), ("P75", p75), ("P90", p90)],
+    ):
+        with col:
+            st.metric(label, fmt(value))
+
+    bins = histogram_frame(counts, edges)
+    bins["value"] = bins["bin_lower"].clip(lower=edges[0])
+    fig_dist = px.bar(
+        bins,
+        x="value",
+        y="count",
+        title=f"Distribution of {metric_labels[dist_metric]}",
+        labels={"value": metric_labels[dist_metric], "count": "Transactions"},
+        log_x=is_money,
+    )
+    fig_dist.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+    )
+    st.plotly_chart(fig_dist, use_container_width=True)
+
+# ── Monthly Orders Heatmap ──────────────────────────────────────────────────
+st.subheader("🗓️ Orders Heatmap")
+
+heat_agg = levels[("year", "month_num")][["year", "month_num", "orders"]]
 heat_pivot = heat_agg.pivot(index="year", columns="month_num", values="orders").fillna(0)
 
 month_names = [
@@ -274,6 +378,28 @@ fig_heat.update_layout(
 )
 st.plotly_chart(fig_heat, use_container_width=True)
 
+# ── Anomalies ───────────────────────────────────────────────────────────────
+st.subheader("🚨 Anomalies")
+
+anomalies_path = os.path.join(PROCESSED_DIR, "anomalies.csv")
+if os.path.exists(anomalies_path):
+    anomalies = pd.read_csv(anomalies_path, parse_dates=["date"])
+    if len(date_range) == 2:
+        anomalies = filter_date_range(
+            anomalies, pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        )
+    if selected_region != "All":
+        anomalies = anomalies[anomalies["region"] == selected_region]
+    if selected_product_ids is not None:
+        anomalies = anomalies[anomalies["product_id"].isin(selected_product_ids)]
+
+    if anomalies.empty:
+        st.info("No anomalies flagged for the current filters.")
+    else:
+        st.dataframe(anomalies.head(50), use_container_width=True)
+else:
+    st.info("Run `python -m src anomalies` to flag unusual days.")
+
 # ── Data Table ──────────────────────────────────────────────────────────────
 st.subheader("📋 Raw Data")
 with st.expander("View filtered data table"):
@@ -0,0 +1,200 @@
+"""
+Time and peak-memory benchmark for the analysis pipeline.
+
+Generates a sales fixture with scripts/generate_data.py (regional
+currencies and a cost table, so FX normalization and the cost model are
+exercised), runs every step that produces the processed artifacts and
+fails if any step exceeds its budget in BUDGETS.
+
+Wall time is the best of several runs; peak memory is the largest
+traced allocation (tracemalloc, which numpy and pandas report to) during
+a separate run, so tracing never inflates the timings.
+
+Usage:
+    python scripts/benchmark_analysis.py [--rows 200000] [--runs 3] [--scale 1.0]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_data
+from src.costs import load_cost_model
+from src.currency import load_fx_rates, normalize_currency
+from src.data_loader import load_data
+from src.kpi_calculator import calculate_kpis
+from src.product_analysis import product_summary
+from src.regional_analysis import regional_summary
+from src.time_analysis import monthly_trends, quarterly_trends
+
+BENCHMARK_ROWS = 200_000
+
+# Per-step budgets at BENCHMARK_ROWS: about 4x the measured time, since
+# timings are noisy across machines, and 2x the measured peak memory,
+# which is deterministic.
+Budget = namedtuple("Budget", ["seconds", "peak_mb"])
+BUDGETS = {
+    "load_data": Budget(seconds=2.0, peak_mb=100),
+    "normalize_currency": Budget(seconds=0.25, peak_mb=60),
+    "calculate_kpis": Budget(seconds=0.25, peak_mb=75),
+    "regional_summary": Budget(seconds=0.15, peak_mb=15),
+    "product_summary": Budget(seconds=0.25, peak_mb=25),
+    "monthly_trends": Budget(seconds=0.4, peak_mb=50),
+    "quarterly_trends": Budget(seconds=0.4, peak_mb=50),
+}
+
+# Processed artifact written from each summary step.
+ARTIFACTS = {
+    "regional_summary": "regional_performance",
+    "product_summary": "product_performance",
+    "monthly_trends": "monthly_sales_trends",
+    "quarterly_trends": "quarterly_sales_trends",
+}
+
+
+def write_fixture(directory: str, num_rows: int, seed: int = generate_data.DEFAULT_SEED) -> dict:
+    """
+    Write generated sales data, FX rates and cost table to `directory`.
+
+    Returns
+    -------
+    dict
+        'sales_path', 'fx_path' and 'cost_path'.
+    """
+    fx_rates = generate_data.generate_fx_rates()
+    rows = generate_data.generate_sales_data(num_rows=num_rows, fx_rates=fx_rates, seed=seed)
+    paths = {
+        "sales_path": os.path.join(directory, "sales_data.csv"),
+        "fx_path": os.path.join(directory, "fx_rates.csv"),
+        "cost_path": os.path.join(directory, "cost_table.csv"),
+    }
+    generate_data.write_csv(paths["sales_path"], rows, generate_data.sales_fields(with_currencies=True))
+    generate_data.write_csv(paths["fx_path"], fx_rates)
+    generate_data.write_csv(paths["cost_path"], generate_data.generate_cost_table())
+    return paths
+
+
+def pipeline_steps(paths: dict) -> list:
+    """
+    Steps producing the processed artifacts from a fixture.
+
+    Returns
+    -------
+    list of tuple
+        (name, input name, function). Each step's output is stored under
+        its name for the steps after it; the first reads 'sales_path'.
+    """
+    rates = load_fx_rates(paths["fx_path"])
+    cost_model = load_cost_model(paths["cost_path"])
+    return [
+        ("load_data", "sales_path", lambda path: load_data(path, quarantine_path=None)),
+        ("normalize_currency", "load_data", lambda df: normalize_currency(df, rates)),
+        ("calculate_kpis", "normalize_currency", lambda df: calculate_kpis(df, cost_model)),
+        ("regional_summary", "calculate_kpis", regional_summary),
+        ("product_summary", "calculate_kpis", product_summary),
+        ("monthly_trends", "calculate_kpis", monthly_trends),
+        ("quarterly_trends", "calculate_kpis", quarterly_trends),
+    ]
+
+
+def run_pipeline(paths: dict) -> dict:
+    """Run every step on a fixture and return each step's output by name."""
+    results = dict(paths)
+    for name, source, func in pipeline_steps(paths):
+        results[name] = func(results[source])
+    return results
+
+
+def measure(func, arg, runs: int = 3) -> tuple:
+    """
+    Best wall time over `runs` calls and peak traced memory of one call.
+
+    Returns
+    -------
+    tuple
+        (result, seconds, peak_mb)
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, min(timings), peak / 1024**2
+
+
+def benchmark(paths: dict, runs: int = 3) -> list:
+    """
+    Measure every pipeline step on a fixture.
+
+    Returns
+    -------
+    list of dict
+        One row per step: step, seconds, peak_mb.
+    """
+    results = dict(paths)
+    rows = []
+    for name, source, func in pipeline_steps(paths):
+        results[name], seconds, peak_mb = measure(func, results[source], runs)
+        rows.append({"step": name, "seconds": seconds, "peak_mb": peak_mb})
+    return rows
+
+
+def over_budget(row: dict, scale: float = 1.0) -> list:
+    """Descriptions of the budgets a measured step exceeds, if any."""
+    budget = BUDGETS[row["step"]]
+    failures = []
+    if row["seconds"] > budget.seconds * scale:
+        failures.append(f"{row['seconds']:.3f}s > {budget.seconds * scale:.3f}s")
+    if row["peak_mb"] > budget.peak_mb * scale:
+        failures.append(f"{row['peak_mb']:.1f}MB > {budget.peak_mb * scale:.1f}MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=BENCHMARK_ROWS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=float(os.environ.get("PERF_BUDGET_SCALE", 1.0)),
+        help="Multiply every budget (e.g. 2 on a slow CI runner)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {args.rows:,} rows...")
+        rows = benchmark(write_fixture(directory, args.rows), args.runs)
+
+    failed = False
+    print(f"{'step':<20}{'seconds':>10}{'peak MB':>10}")
+    for row in rows:
+        failures = over_budget(row, args.scale) if args.rows == BENCHMARK_ROWS else []
+        failed |= bool(failures)
+        status = "OVER BUDGET: " + ", ".join(failures) if failures else ""
+        print(f"{row['step']:<20}{row['seconds']:>10.3f}{row['peak_mb']:>10.1f}  {status}")
+
+    if args.rows != BENCHMARK_ROWS:
+        print(f"Budgets apply at {BENCHMARK_ROWS:,} rows; not checked.")
+    elif not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
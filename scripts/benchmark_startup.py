@@ -0,0 +1,96 @@
+"""
+Startup-latency benchmark for the sales-analysis CLI.
+
+Times `python -m src --help` and a cached `summary` run in fresh
+interpreters and fails if the median exceeds the budget, or if importing
+the CLI pulls in pandas/numpy eagerly.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 7] [--budget-ms 150]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "streamlit"]
+
+
+def time_command(args: list, runs: int) -> float:
+    """Return the median wall time in milliseconds of a command."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            args,
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def eager_heavy_imports() -> list:
+    """Return heavy modules imported as a side effect of importing the CLI."""
+    probe = (
+        "import sys, src.cli; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    failures = []
+
+    eager = eager_heavy_imports()
+    if eager:
+        failures.append(f"src.cli imports heavy modules at startup: {', '.join(eager)}")
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    help_ms = time_command([sys.executable, "-m", "src", "--help"], args.runs)
+    print(f"Interpreter baseline : {baseline:8.1f} ms")
+    print(f"sales-analysis --help: {help_ms:8.1f} ms")
+    if help_ms > args.budget_ms:
+        failures.append(f"--help took {help_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    # Warm the processed cache once, then time the cached path.
+    subprocess.run(
+        [sys.executable, "-m", "src", "summary"],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    summary_ms = time_command([sys.executable, "-m", "src", "summary"], args.runs)
+    print(f"summary (cached)     : {summary_ms:8.1f} ms")
+    if summary_ms > args.budget_ms:
+        failures.append(
+            f"cached summary took {summary_ms:.1f} ms (budget {args.budget_ms:.0f} ms)"
+        )
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
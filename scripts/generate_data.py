@@ -2,6 +2,7 @@
 Generate realistic sample sales data for the Sales Performance Analysis project.
 """
 
+import argparse
 import csv
 import random
 import os
@@ -25,24 +26,121 @@ PRODUCTS = [
     {"id": "P010", "name": "Phone Charger", "base_price": 19.99},
 ]
 
-random.seed(42)
+# Used with --currencies: each region's local currency, and the starting
+# USD value of one unit for the daily FX random walk.
+REGION_CURRENCIES = {"North": "USD", "South": "USD", "East": "EUR", "West": "GBP"}
+FX_START_RATES = {"EUR": 1.09, "GBP": 1.27, "JPY": 0.0068}
 
+# Used with --costs: share of list price paid for goods, and flat shipping
+# per order, per product.
+COGS_SHARE = {
+    "P001": 0.72, "P002": 0.45, "P003": 0.50, "P004": 0.40, "P005": 0.65,
+    "P006": 0.48, "P007": 0.55, "P008": 0.60, "P009": 0.70, "P010": 0.35,
+}
+SHIPPING_PER_ORDER = {
+    "P001": 25.0, "P002": 4.0, "P003": 8.0, "P004": 4.0, "P005": 30.0,
+    "P006": 5.0, "P007": 8.0, "P008": 5.0, "P009": 15.0, "P010": 3.0,
+}
 
-def random_date(start, end):
+DEFAULT_SEED = 42
+
+SALES_FIELDS = [
+    "date",
+    "order_id",
+    "product_id",
+    "product_name",
+    "region",
+    "visitors",
+    "customers",
+    "orders",
+    "revenue",
+]
+
+
+def random_date(start, end, rng=random):
     delta = end - start
-    random_days = random.randint(0, delta.days)
+    random_days = rng.randint(0, delta.days)
     return start + timedelta(days=random_days)
 
 
-def generate_sales_data():
-    """Generate sample sales records."""
+def generate_fx_rates():
+    """Weekday FX rates (USD per unit) as a random walk per currency."""
+    fx_rng = random.Random(11)
+    rows = []
+    for currency, rate in FX_START_RATES.items():
+        date = START_DATE
+        while date <= END_DATE:
+            if date.weekday() < 5:
+                rate *= 1 + fx_rng.gauss(0, 0.003)
+                rows.append(
+                    {"date": date.strftime("%Y-%m-%d"), "currency": currency, "rate": round(rate, 6)}
+                )
+            date += timedelta(days=1)
+    return rows
+
+
+def generate_cost_table():
+    """
+    Per-product cost periods: a 2025 supplier price rise and deeper
+    discounts in each November-December holiday season.
+    """
+    periods = [
+        ("2024-01", 1.00, 0.03),
+        ("2024-11", 1.00, 0.12),
+        ("2025-01", 1.04, 0.03),
+        ("2025-11", 1.04, 0.12),
+    ]
+    rows = []
+    for product in PRODUCTS:
+        for month, cogs_factor, discount_rate in periods:
+            rows.append(
+                {
+                    "product_id": product["id"],
+                    "effective_from": month,
+                    "unit_cogs": round(product["base_price"] * COGS_SHARE[product["id"]] * cogs_factor, 2),
+                    "shipping_per_order": SHIPPING_PER_ORDER[product["id"]],
+                    "discount_rate": discount_rate,
+                }
+            )
+    return rows
+
+
+def fx_rate_on(fx_lookup, currency, date):
+    """Latest rate for `currency` on or before `date` (weekends use Friday's)."""
+    if currency == "USD":
+        return 1.0
+    while (currency, date.strftime("%Y-%m-%d")) not in fx_lookup:
+        date -= timedelta(days=1)
+    return fx_lookup[(currency, date.strftime("%Y-%m-%d"))]
+
+
+def generate_sales_data(num_rows=NUM_ROWS, with_customer_ids=False, fx_rates=None, seed=DEFAULT_SEED):
+    """
+    Generate sample sales records.
+
+    The same `seed` and `num_rows` always give the same records, so tests
+    can regenerate fixtures of any size.
+
+    With `with_customer_ids`, each row also gets a customer_id drawn from a
+    pool of num_rows // 3 customers, skewed so that some customers buy
+    repeatedly. Customer ids use their own random stream, so the other
+    columns are the same either way.
+
+    With `fx_rates` (see generate_fx_rates), revenue is recorded in the
+    region's local currency and a currency column is added.
+    """
+    rng = random.Random(seed)
     rows = []
     order_id = 10000
+    if fx_rates is not None:
+        fx_lookup = {(r["currency"], r["date"]): r["rate"] for r in fx_rates}
+    customer_rng = random.Random(7)
+    num_customers = max(1, num_rows // 3)
 
-    for _ in range(NUM_ROWS):
-        date = random_date(START_DATE, END_DATE)
-        region = random.choice(REGIONS)
-        product = random.choice(PRODUCTS)
+    for _ in range(num_rows):
+        date = random_date(START_DATE, END_DATE, rng)
+        region = rng.choice(REGIONS)
+        product = rng.choice(PRODUCTS)
 
         # Seasonal multiplier (Q4 holiday boost)
         month = date.month
@@ -57,55 +155,101 @@ def generate_sales_data():
         # Regional multiplier
         region_mult = {"North": 1.1, "South": 0.95, "East": 1.0, "West": 1.15}
 
-        visitors = int(random.randint(80, 500) * seasonal * region_mult[region])
-        orders = max(1, int(visitors * random.uniform(0.02, 0.12)))
+        visitors = int(rng.randint(80, 500) * seasonal * region_mult[region])
+        orders = max(1, int(visitors * rng.uniform(0.02, 0.12)))
         base_revenue = product["base_price"] * orders
-        revenue = round(base_revenue * random.uniform(0.85, 1.15), 2)
-        customers = max(1, int(orders * random.uniform(0.7, 1.0)))
+        revenue = round(base_revenue * rng.uniform(0.85, 1.15), 2)
+        customers = max(1, int(orders * rng.uniform(0.7, 1.0)))
 
         order_id += 1
-        rows.append(
-            {
-                "date": date.strftime("%Y-%m-%d"),
-                "order_id": f"ORD-{order_id}",
-                "product_id": product["id"],
-                "product_name": product["name"],
-                "region": region,
-                "visitors": visitors,
-                "customers": customers,
-                "orders": orders,
-                "revenue": revenue,
-            }
-        )
+        row = {
+            "date": date.strftime("%Y-%m-%d"),
+            "order_id": f"ORD-{order_id}",
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "region": region,
+            "visitors": visitors,
+            "customers": customers,
+            "orders": orders,
+            "revenue": revenue,
+        }
+        if with_customer_ids:
+            customer = int(num_customers * customer_rng.random() ** 2) + 1
+            row["customer_id"] = f"C{customer:06d}"
+        if fx_rates is not None:
+            currency = REGION_CURRENCIES[region]
+            row["currency"] = currency
+            row["revenue"] = round(revenue / fx_rate_on(fx_lookup, currency, date), 2)
+        rows.append(row)
 
     # Sort by date
     rows.sort(key=lambda x: x["date"])
     return rows
 
 
+def sales_fields(with_customer_ids=False, with_currencies=False):
+    """Column order of the sales CSV for the given optional columns."""
+    fields = list(SALES_FIELDS)
+    if with_customer_ids:
+        fields.append("customer_id")
+    if with_currencies:
+        fields.append("currency")
+    return fields
+
+
+def write_csv(path, rows, fieldnames=None):
+    """Write generated records to `path`; columns default to the first row's keys."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames or list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate sample sales data.")
+    parser.add_argument(
+        "--customer-ids", action="store_true", help="Add a customer_id column"
+    )
+    parser.add_argument(
+        "--currencies",
+        action="store_true",
+        help="Record revenue in regional currencies and write fx_rates.csv",
+    )
+    parser.add_argument(
+        "--costs", action="store_true", help="Also write the product cost table"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=NUM_ROWS, help=f"Number of sales records (default {NUM_ROWS})"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help=f"Random seed (default {DEFAULT_SEED})"
+    )
+    args = parser.parse_args()
+
     output_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "sales_data.csv")
 
-    rows = generate_sales_data()
-
-    fieldnames = [
-        "date",
-        "order_id",
-        "product_id",
-        "product_name",
-        "region",
-        "visitors",
-        "customers",
-        "orders",
-        "revenue",
-    ]
+    fx_rates = None
+    if args.currencies:
+        fx_rates = generate_fx_rates()
+        fx_path = os.path.join(output_dir, "fx_rates.csv")
+        write_csv(fx_path, fx_rates)
+        print(f"Generated {len(fx_rates)} FX rates -> {fx_path}")
 
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    if args.costs:
+        cost_rows = generate_cost_table()
+        cost_path = os.path.join(output_dir, "cost_table.csv")
+        write_csv(cost_path, cost_rows)
+        print(f"Generated {len(cost_rows)} cost periods -> {cost_path}")
+
+    rows = generate_sales_data(
+        num_rows=args.rows,
+        with_customer_ids=args.customer_ids,
+        fx_rates=fx_rates,
+        seed=args.seed,
+    )
+    write_csv(output_path, rows, sales_fields(args.customer_ids, args.currencies))
 
     print(f"Generated {len(rows)} sales records -> {output_path}")
 
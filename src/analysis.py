@@ -7,38 +7,28 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.data_loader import load_data
-from src.kpi_calculator import calculate_kpis
+from src.data_loader import load_enriched
+from src.output_writer import save_artifact
+from src.rollup import rollup
 
 
 def main():
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-    )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
-
-    region_summary = (
-        df.groupby("region")
-        .agg(
-            total_revenue=("revenue", "sum"),
-            total_orders=("orders", "sum"),
-            avg_conversion_rate=("conversion_rate", "mean"),
-            avg_aov=("average_order_value", "mean"),
-        )
-        .reset_index()
-    )
+    df = load_enriched()
+
+    levels = rollup(df, [("region",)])
+    region_summary = levels[("region",)].rename(
+        columns={
+            "revenue": "total_revenue",
+            "orders": "total_orders",
+            "conversion_rate": "avg_conversion_rate",
+            "average_order_value": "avg_aov",
+        }
+    )[["region", "total_revenue", "total_orders", "avg_conversion_rate", "avg_aov"]]
 
     print("\nRegional Sales Performance:\n")
     print(region_summary)
 
-    output_dir = os.path.join(
-        os.path.dirname(__file__), "..", "data", "processed"
-    )
-    os.makedirs(output_dir, exist_ok=True)
-    region_summary.to_csv(
-        os.path.join(output_dir, "region_performance_summary.csv"), index=False
-    )
+    save_artifact(region_summary, "region_performance_summary")
 
 
 if __name__ == "__main__":
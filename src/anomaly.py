@@ -0,0 +1,350 @@
+"""
+Anomaly detection over daily region x product KPI series.
+
+Daily aggregates are laid out as (day x series) matrices, one per metric.
+For every day the trailing window of previous days is viewed as a third
+array axis (numpy sliding_window_view), so rolling mean/std and rolling
+median/MAD are computed for all series at once; the only Python loop is
+over tiles of days x series holding at most `block_cells` window values,
+so memory stays flat however long the history is.
+
+Scores:
+    zscore        (x - rolling mean) / rolling std
+    robust_score  0.6745 * (x - rolling median) / rolling MAD
+
+Days without a row for a series are missing, not zero: they are skipped
+by the NaN-aware window statistics and never scored, so a gap in a sparse
+series is not reported as a drop, and a window needs min_periods observed
+days before it scores anything.
+
+A detector keeps the trailing window per series, so scoring a newly
+landed day only needs that day plus the stored window; the incremental
+run reads only the aggregate months from the first unscored day on.
+"""
+
+import itertools
+import os
+import pickle
+import sys
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.output_writer import PROCESSED_DIR, save_artifact, write_atomic
+
+SERIES_KEYS = ["region", "product_id"]
+METRICS = ["revenue", "orders", "conversion_rate"]
+
+DEFAULT_STATE_PATH = os.path.join(PROCESSED_DIR, "anomaly_state.pkl")
+
+TABLE_COLUMNS = [
+    "date",
+    "region",
+    "product_id",
+    "metric",
+    "value",
+    "expected",
+    "zscore",
+    "robust_score",
+    "direction",
+    "severity",
+]
+
+
+@dataclass
+class AnomalyConfig:
+    """Detection parameters."""
+
+    window: int = 28
+    min_periods: int = 14
+    robust_threshold: float = 3.5
+    z_threshold: float = 3.0
+    block_cells: int = 2_000_000
+
+
+def daily_matrices(aggregates: pd.DataFrame, days: pd.DatetimeIndex = None) -> tuple:
+    """
+    Pivot daily aggregates into one (day x series) matrix per metric.
+
+    Parameters
+    ----------
+    aggregates : pd.DataFrame
+        One row per date x region x product_id with revenue, orders and
+        visitors, e.g. ingest.load_daily_aggregates().
+    days : pd.DatetimeIndex, optional
+        Days to lay out; defaults to every day between the first and last
+        date in `aggregates`. Days without a row for a series are missing
+        (NaN) in every metric, so gaps in sparse series are neither scored
+        nor counted as observations of the trailing windows.
+
+    Returns
+    -------
+    tuple
+        (days, series, matrices) where series is a MultiIndex of
+        (region, product_id) and matrices maps metric -> 2-D float array.
+    """
+    if days is None:
+        days = pd.date_range(aggregates["date"].min(), aggregates["date"].max(), freq="D")
+
+    indexed = aggregates.set_index(["date"] + SERIES_KEYS)
+    matrices = {}
+    for col in ["revenue", "orders", "visitors"]:
+        matrices[col] = indexed[col].unstack(SERIES_KEYS).reindex(days)
+    series = matrices["revenue"].columns
+    for col in matrices:
+        matrices[col] = matrices[col].reindex(columns=series).to_numpy(float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conversion = matrices["orders"] / matrices["visitors"]
+    conversion[matrices["visitors"] == 0] = np.nan
+    matrices["conversion_rate"] = conversion
+    del matrices["visitors"]
+    return days, series, matrices
+
+
+def rolling_scores(values: np.ndarray, n_new: int, config: AnomalyConfig) -> tuple:
+    """
+    Score the last `n_new` rows of a (day x series) matrix against their trailing windows.
+
+    Rows before the last `n_new` serve only as history.
+
+    Returns
+    -------
+    tuple
+        (expected, zscore, robust_score) arrays of shape (n_new, series).
+    """
+    n_days, n_series = values.shape
+    window = config.window
+    padded = np.vstack([np.full((window, n_series), np.nan), values])
+
+    expected = np.full((n_new, n_series), np.nan)
+    zscore = np.full((n_new, n_series), np.nan)
+    robust = np.full((n_new, n_series), np.nan)
+
+    # The window statistics copy days x series x window values; tile both
+    # axes so each tile holds at most block_cells of them.
+    width = max(1, min(n_series, config.block_cells // window))
+    span = max(1, config.block_cells // (width * window))
+    first = n_days - n_new
+    for lo, d0 in itertools.product(range(0, n_series, width), range(0, n_new, span)):
+        hi = min(lo + width, n_series)
+        d1 = min(d0 + span, n_new)
+        # windows[i] covers the `window` days before day first + d0 + i.
+        rows = padded[first + d0 : first + d1 + window - 1, lo:hi]
+        windows = sliding_window_view(rows, window, axis=0)
+        current = values[first + d0 : first + d1, lo:hi]
+
+        # Windows with no observations yet are expected; they score NaN.
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            count = np.sum(~np.isnan(windows), axis=-1)
+            mean = np.nanmean(windows, axis=-1)
+            std = np.nanstd(windows, axis=-1, ddof=1)
+            median = np.nanmedian(windows, axis=-1)
+            mad = np.nanmedian(np.abs(windows - median[..., None]), axis=-1)
+
+            enough = count >= config.min_periods
+            z = np.where(enough & (std > 0), (current - mean) / std, np.nan)
+            r = np.where(enough & (mad > 0), 0.6745 * (current - median) / mad, np.nan)
+
+        expected[d0:d1, lo:hi] = np.where(enough, median, np.nan)
+        zscore[d0:d1, lo:hi] = z
+        robust[d0:d1, lo:hi] = r
+
+    return expected, zscore, robust
+
+
+def _anomaly_table(days, series, matrices, scores, config) -> pd.DataFrame:
+    frames = []
+    for metric, (expected, zscore, robust) in scores.items():
+        values = matrices[metric][-len(days):]
+        flagged = (np.abs(robust) >= config.robust_threshold) | (
+            np.abs(zscore) >= config.z_threshold
+        )
+        flagged &= ~np.isnan(values)
+        day_idx, series_idx = np.nonzero(flagged)
+        if len(day_idx) == 0:
+            continue
+        keys = series[series_idx].to_frame(index=False)
+        frame = pd.DataFrame(
+            {
+                "date": days[day_idx],
+                "region": keys["region"].to_numpy(),
+                "product_id": keys["product_id"].to_numpy(),
+                "metric": metric,
+                "value": values[day_idx, series_idx],
+                "expected": expected[day_idx, series_idx],
+                "zscore": zscore[day_idx, series_idx],
+                "robust_score": robust[day_idx, series_idx],
+            }
+        )
+        frames.append(frame)
+
+    if not frames:
+        return _empty_table()
+
+    table = pd.concat(frames, ignore_index=True)
+    strength = table["robust_score"].abs().fillna(table["zscore"].abs())
+    table["direction"] = np.where(table["value"] >= table["expected"], "spike", "drop")
+    table["severity"] = strength.round(2)
+    table = table.sort_values(["severity", "date"], ascending=[False, False])
+    return table.round({"value": 4, "expected": 4, "zscore": 2, "robust_score": 2}).reset_index(drop=True)
+
+
+def _empty_table() -> pd.DataFrame:
+    return pd.DataFrame(columns=TABLE_COLUMNS)
+
+
+class AnomalyDetector:
+    """
+    Incremental detector holding the trailing window of every series.
+
+    Parameters
+    ----------
+    config : AnomalyConfig, optional
+        Detection parameters.
+    """
+
+    def __init__(self, config: AnomalyConfig = None):
+        self.config = config or AnomalyConfig()
+        self.last_day = None
+        self.series = None
+        self.history = None
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_STATE_PATH) -> "AnomalyDetector":
+        detector = cls()
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            detector.config = state["config"]
+            detector.last_day = state["last_day"]
+            detector.series = state["series"]
+            detector.history = state["history"]
+        return detector
+
+    def save(self, path: str = DEFAULT_STATE_PATH):
+        state = {
+            "config": self.config,
+            "last_day": self.last_day,
+            "series": self.series,
+            "history": self.history,
+        }
+        write_atomic(state, path, fmt="pickle")
+
+    def update(self, aggregates: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score the days in `aggregates` after the last day already seen.
+
+        Days at or before the stored last day are ignored; run detect() for
+        a full recompute after back-dated corrections.
+
+        Returns
+        -------
+        pd.DataFrame
+            Ranked anomalies for the newly scored days.
+        """
+        if self.last_day is not None:
+            aggregates = aggregates[aggregates["date"] > self.last_day]
+        if aggregates.empty:
+            return _empty_table()
+
+        start = aggregates["date"].min() if self.last_day is None else self.last_day + pd.Timedelta(days=1)
+        days = pd.date_range(start, aggregates["date"].max(), freq="D")
+        new_days, new_series, new = daily_matrices(aggregates, days)
+
+        series = new_series if self.series is None else self.series.union(new_series)
+        combined = {}
+        for metric in METRICS:
+            # Series absent from either side have no observations there.
+            current = _align(new[metric], new_series, series)
+            if self.history is None:
+                previous = np.empty((0, len(series)))
+            else:
+                previous = _align(self.history[metric], self.series, series)
+            combined[metric] = np.vstack([previous, current])
+
+        scores = {m: rolling_scores(combined[m], len(days), self.config) for m in METRICS}
+        table = _anomaly_table(days, series, combined, scores, self.config)
+
+        window = self.config.window
+        self.history = {m: combined[m][-window:] for m in METRICS}
+        self.series = series
+        self.last_day = days[-1]
+        return table
+
+
+def _align(values: np.ndarray, source: pd.MultiIndex, target: pd.MultiIndex) -> np.ndarray:
+    """Reorder columns from `source` series to `target`; absent series are NaN."""
+    if source.equals(target):
+        return values
+    out = np.full((len(values), len(target)), np.nan)
+    out[:, target.get_indexer(source)] = values
+    return out
+
+
+def detect(aggregates: pd.DataFrame, config: AnomalyConfig = None) -> tuple:
+    """
+    Full recompute: score every day of every series.
+
+    Returns
+    -------
+    tuple
+        (anomalies, detector) with the detector primed for later update() calls.
+    """
+    detector = AnomalyDetector(config)
+    return detector.update(aggregates), detector
+
+
+def anomaly_analysis(incremental: bool = False) -> pd.DataFrame:
+    """
+    Detect anomalies in the daily aggregates and write the ranked table.
+
+    With `incremental`, only days after the stored detector state are
+    read, scored and appended to the existing table.
+
+    Returns
+    -------
+    pd.DataFrame
+        Ranked anomaly table (data/processed/anomalies.csv).
+    """
+    from src.data_loader import load_enriched
+    from src.ingest import aggregate_partitions, has_daily_aggregates, load_daily_aggregates
+
+    detector = AnomalyDetector.load() if incremental else None
+    start = None
+    if detector is not None and detector.last_day is not None:
+        start = detector.last_day + pd.Timedelta(days=1)
+
+    if has_daily_aggregates():
+        aggregates = load_daily_aggregates(start=start)
+    else:
+        rows = load_enriched(start=start, kpis=False)
+        aggregates = aggregate_partitions(rows).reset_index()
+
+    if incremental:
+        table = detector.update(aggregates)
+        previous_path = os.path.join(PROCESSED_DIR, "anomalies.csv")
+        if os.path.exists(previous_path):
+            previous = pd.read_csv(previous_path, parse_dates=["date"])
+            if not table.empty:
+                previous = pd.concat([previous, table], ignore_index=True)
+            table = previous.sort_values(["severity", "date"], ascending=[False, False])
+    else:
+        table, detector = detect(aggregates)
+
+    detector.save()
+    output_path = save_artifact(table, "anomalies", fmt="csv")
+    print(f"Anomalies detected -> {output_path}")
+    print(f"  Flagged: {len(table)} (series x day x metric)")
+    return table
+
+
+if __name__ == "__main__":
+    result = anomaly_analysis()
+    print(result.head(20).to_string(index=False))
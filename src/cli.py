@@ -0,0 +1,267 @@
+"""
+Unified command-line entry point for the analysis scripts.
+
+Usage:
+    python -m src <command> [--refresh]
+
+Heavy dependencies (pandas, numpy) are imported only when a subcommand
+actually has to recompute its output. When the processed artifact is newer
+than the raw data it is printed straight from disk, so cron jobs that just
+need the latest numbers pay interpreter startup and nothing more.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+RAW_DATA_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "sales_data.csv")
+PROCESSED_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
+STORE_MANIFEST_PATH = os.path.join(PROCESSED_DIR, "store", "sales", "_manifest.csv")
+FX_RATES_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "fx_rates.csv")
+COST_TABLE_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "cost_table.csv")
+
+SUMMARY_FILE = "kpi_summary.json"
+
+# Public formats from src.output_writer.FORMAT_EXTENSIONS; kept here so --help
+# stays cheap.
+OUTPUT_FORMATS = ["csv", "csv.gz", "parquet", "feather"]
+
+# command -> (module, function, processed artifact written by the function)
+TABLE_COMMANDS = {
+    "regional": ("src.regional_analysis", "regional_analysis", "regional_performance.csv"),
+    "product": ("src.product_analysis", "product_analysis", "product_performance.csv"),
+    "monthly": ("src.time_analysis", "monthly_analysis", "monthly_sales_trends.csv"),
+    "quarterly": ("src.time_analysis", "quarterly_analysis", "quarterly_sales_trends.csv"),
+}
+
+
+def is_fresh(
+    artifact_path: str,
+    source_paths: tuple = (RAW_DATA_PATH, STORE_MANIFEST_PATH, FX_RATES_PATH, COST_TABLE_PATH),
+) -> bool:
+    """
+    Check whether a processed artifact is up to date with its inputs.
+
+    Parameters
+    ----------
+    artifact_path : str
+        Path to the processed output.
+    source_paths : tuple of str
+        Inputs the artifact may have been derived from: the raw CSV, the
+        manifest of the partitioned store, the FX rates and the cost
+        table. Missing inputs are ignored.
+
+    Returns
+    -------
+    bool
+        True if the artifact exists and is not older than any input.
+    """
+    sources = [p for p in source_paths if os.path.exists(p)]
+    if not os.path.exists(artifact_path) or not sources:
+        return False
+    return os.path.getmtime(artifact_path) >= max(os.path.getmtime(p) for p in sources)
+
+
+def format_csv_table(path: str) -> str:
+    """Render a processed CSV as an aligned text table without pandas."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return ""
+    widths = [max(len(row[i]) for row in rows if i < len(row)) for i in range(len(rows[0]))]
+    return "\n".join(
+        " ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def run_table(command: str, refresh: bool = False, fmt: str = None, **kwargs) -> str:
+    """
+    Return the text table for a table command, recomputing only if stale.
+
+    `fmt` overrides the artifact format; by default it comes from the
+    SALES_OUTPUT_FORMAT environment variable, else csv. Only full-history
+    plain CSV artifacts are served from the cache; other formats and date
+    windows (passed through `kwargs`) are always recomputed.
+    """
+    module_name, func_name, artifact = TABLE_COMMANDS[command]
+    artifact_path = os.path.join(PROCESSED_DIR, artifact)
+    windowed = any(v is not None for v in kwargs.values())
+    resolved = fmt or os.environ.get("SALES_OUTPUT_FORMAT", "csv")
+    if resolved == "csv" and not refresh and not windowed and is_fresh(artifact_path):
+        return format_csv_table(artifact_path)
+
+    import importlib
+
+    from src import output_writer
+
+    if fmt:
+        output_writer.set_default_format(fmt)
+    func = getattr(importlib.import_module(module_name), func_name)
+    result = func(**{k: v for k, v in kwargs.items() if v is not None})
+    return result.to_string(index=False)
+
+
+def run_summary(refresh: bool = False) -> dict:
+    """Return the dataset-wide KPI summary, recomputing only if stale."""
+    summary_path = os.path.join(PROCESSED_DIR, SUMMARY_FILE)
+    if not refresh and is_fresh(summary_path):
+        with open(summary_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    from src.data_loader import load_enriched
+    from src.kpi_calculator import summarize_kpis
+
+    summary = summarize_kpis(load_enriched())
+    summary = {k: v.item() if hasattr(v, "item") else v for k, v in summary.items()}
+
+    _write_json_atomic(summary, summary_path)
+    return summary
+
+
+def _write_json_atomic(obj, path: str):
+    """Write JSON to a temp file beside `path` and rename it into place."""
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def format_summary(summary: dict) -> str:
+    width = max(len(k) for k in summary)
+    return "\n".join(f"{k.ljust(width)}  {v}" for k, v in summary.items())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sales-analysis",
+        description="Sales performance analysis commands.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    help_text = {
+        "regional": "Regional performance summary",
+        "product": "Product performance summary",
+        "monthly": "Monthly sales trends by region",
+        "quarterly": "Quarterly sales trends by region",
+        "summary": "Dataset-wide KPI summary",
+        "report": "All of the above",
+    }
+    for name, text in help_text.items():
+        sub = subparsers.add_parser(name, help=text)
+        sub.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Recompute even if the processed output is fresh",
+        )
+        sub.add_argument(
+            "--format",
+            choices=OUTPUT_FORMATS,
+            help="Format for processed artifacts (default: $SALES_OUTPUT_FORMAT, else csv)",
+        )
+        if name in ("monthly", "quarterly"):
+            sub.add_argument("--start", help="First date to include (YYYY-MM-DD)")
+            sub.add_argument("--end", help="Last date to include (YYYY-MM-DD)")
+
+    ingest = subparsers.add_parser(
+        "ingest", help="Upsert raw files into the deduplicated order store"
+    )
+    ingest.add_argument("files", nargs="+", help="Raw sales CSV files, oldest first")
+
+    forecast = subparsers.add_parser(
+        "forecast", help="Forecast revenue and orders for every region x product"
+    )
+    forecast.add_argument("--horizon", type=int, default=3, help="Months ahead (default: 3)")
+    forecast.add_argument("--jobs", type=int, default=1, help="Worker processes")
+
+    anomalies = subparsers.add_parser(
+        "anomalies", help="Flag unusual days per region x product series"
+    )
+    anomalies.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Score only days after the last run",
+    )
+
+    subparsers.add_parser(
+        "distribution", help="Median and percentiles of AOV, conversion and revenue per visitor"
+    )
+    subparsers.add_parser(
+        "cohorts", help="Customer retention by cohort and repeat-purchase rates"
+    )
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command in TABLE_COMMANDS:
+        window = {}
+        if args.command in ("monthly", "quarterly"):
+            window = {"start": args.start, "end": args.end}
+        print(run_table(args.command, refresh=args.refresh, fmt=args.format, **window))
+    elif args.command == "summary":
+        print(format_summary(run_summary(refresh=args.refresh)))
+    elif args.command == "report":
+        for command in TABLE_COMMANDS:
+            print(f"\n== {command.capitalize()} ==\n")
+            print(run_table(command, refresh=args.refresh, fmt=args.format))
+        print("\n== Summary ==\n")
+        print(format_summary(run_summary(refresh=args.refresh)))
+    elif args.command == "ingest":
+        from src.ingest import ingest_file
+
+        for path in args.files:
+            result = ingest_file(path)
+            print(
+                f"{path}: {result.new_rows} new, {result.corrected_rows} corrected, "
+                f"{result.replayed_rows} replayed, {result.quarantined_rows} quarantined, "
+                f"{len(result.affected_partitions)} partitions re-aggregated"
+            )
+    elif args.command == "forecast":
+        from src.forecasting import forecast_analysis
+
+        forecast_analysis(horizon=args.horizon, n_jobs=args.jobs)
+    elif args.command == "anomalies":
+        from src.anomaly import anomaly_analysis
+
+        table = anomaly_analysis(incremental=args.incremental)
+        print(table.head(20).to_string(index=False))
+    elif args.command == "distribution":
+        from src.histograms import distribution_analysis
+
+        print(distribution_analysis().to_string(index=False))
+    elif args.command == "cohorts":
+        from src.cohort import cohort_analysis
+
+        try:
+            results = cohort_analysis()
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        print(results["retention"].to_string(index=False))
+        print()
+        print(results["repeat_by_region"].to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Customer cohort and retention analysis.
+
+Requires sales rows carrying a 'customer_id' (see validation.OPTIONAL_COLUMNS).
+Customers are integer-coded once and every result is derived from sorted
+code arrays:
+
+    - one sort by (customer, date) gives each customer's first-purchase
+      month as the month at the start of their run (no per-customer groupby);
+    - active (customer, month) pairs are the positions where either the
+      customer or the month changes in that order;
+    - retention counts are a single bincount over (cohort, months since).
+
+Repeat-purchase rates sort (customer, dimension) pair codes and count run
+lengths the same way. Memory stays at a few integer arrays per row, so the
+approach scales to hundreds of millions of orders.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.data_loader import load_data, resolve_data_path
+from src.output_writer import save_artifact
+
+
+def _customer_rows(df: pd.DataFrame) -> pd.DataFrame:
+    if "customer_id" not in df.columns:
+        raise ValueError("cohort analysis needs a customer_id column")
+    return df[df["customer_id"].notna()]
+
+
+def _month_numbers(dates: pd.Series) -> np.ndarray:
+    """Months since 1970-01 as int64."""
+    return dates.to_numpy(dtype="datetime64[M]").astype(np.int64)
+
+
+def _month_labels(month_numbers: np.ndarray) -> list:
+    return [f"{1970 + m // 12:04d}-{m % 12 + 1:02d}" for m in month_numbers]
+
+
+def _sorted_by_customer(df: pd.DataFrame) -> tuple:
+    """
+    Integer-code customers and sort rows by (customer, date).
+
+    Returns
+    -------
+    tuple
+        (customer_codes, months, order) where order is the sorting
+        permutation and codes/months are already in sorted order.
+    """
+    codes, _ = pd.factorize(df["customer_id"])
+    days = df["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    if len(days):
+        days -= days.min()
+    # One argsort over a combined key is much cheaper than a two-key lexsort.
+    order = np.argsort(codes.astype(np.int64) * (int(days.max(initial=0)) + 1) + days)
+    return codes[order], _month_numbers(df["date"])[order], order
+
+
+def _run_starts(*sorted_keys: np.ndarray) -> np.ndarray:
+    """Boolean mask marking the first row of every run of equal keys."""
+    n = len(sorted_keys[0])
+    starts = np.zeros(n, dtype=bool)
+    if n:
+        starts[0] = True
+        for key in sorted_keys:
+            starts[1:] |= key[1:] != key[:-1]
+    return starts
+
+
+def assign_cohorts(df: pd.DataFrame) -> pd.Series:
+    """
+    First-purchase month of each row's customer.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows with 'date' and 'customer_id'.
+
+    Returns
+    -------
+    pd.Series
+        Cohort month ('YYYY-MM') aligned with `df`; missing for rows without
+        a customer id.
+    """
+    rows = _customer_rows(df)
+    codes, months, order = _sorted_by_customer(rows)
+    starts = _run_starts(codes)
+    # Carry each run's first month forward to every row of the run.
+    first_month = months[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+
+    cohort = np.empty(len(rows), dtype=np.int64)
+    cohort[order] = first_month
+    uniques = np.unique(cohort)
+    labels = pd.Categorical.from_codes(np.searchsorted(uniques, cohort), _month_labels(uniques))
+    return pd.Series(labels, index=rows.index, name="cohort").reindex(df.index).astype(object)
+
+
+def retention_matrix(df: pd.DataFrame, normalize: bool = True) -> pd.DataFrame:
+    """
+    Cohort retention: first-purchase month x months since first purchase.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows with 'date' and 'customer_id'.
+    normalize : bool
+        Return the share of each cohort active in a month (True) or the
+        count of active customers (False).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per cohort month with a 'cohort_size' column and one column
+        per month offset (0 = the first-purchase month, always 1.0 when
+        normalized).
+    """
+    rows = _customer_rows(df)
+    codes, months, _ = _sorted_by_customer(rows)
+    if len(codes) == 0:
+        return pd.DataFrame(columns=["cohort", "cohort_size"])
+
+    starts = _run_starts(codes)
+    first_month = months[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+
+    # Within a customer months are non-decreasing, so each active
+    # (customer, month) pair is where the customer or the month changes.
+    active = _run_starts(codes, months)
+    cohort = first_month[active]
+    offset = months[active] - cohort
+
+    cohorts, cohort_idx = np.unique(cohort, return_inverse=True)
+    n_offsets = int(offset.max()) + 1
+    counts = np.bincount(
+        cohort_idx * n_offsets + offset, minlength=len(cohorts) * n_offsets
+    ).reshape(len(cohorts), n_offsets)
+
+    sizes = counts[:, 0]
+    values = counts / sizes[:, None] if normalize else counts
+    matrix = pd.DataFrame(values, columns=list(range(n_offsets)))
+    if normalize:
+        matrix = matrix.round(4)
+    # Offsets beyond the last observed month are unknown, not zero.
+    observable = months.max() - cohorts
+    matrix = matrix.mask(np.arange(n_offsets)[None, :] > observable[:, None])
+    matrix.insert(0, "cohort_size", sizes)
+    matrix.insert(0, "cohort", _month_labels(cohorts))
+    return matrix
+
+
+def repeat_purchase_rates(df: pd.DataFrame, by: str = "region") -> pd.DataFrame:
+    """
+    Share of customers buying more than once within each value of `by`.
+
+    A customer counts once per value of `by` (e.g. per region) and is a
+    repeat customer there if they have two or more orders in it.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows with 'customer_id' and the `by` column.
+    by : str
+        Dimension column, e.g. 'region' or 'product_name'.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: `by`, customers, repeat_customers, repeat_rate, sorted by
+        repeat_rate descending.
+    """
+    rows = _customer_rows(df)
+    customer_codes, _ = pd.factorize(rows["customer_id"])
+    key_codes, keys = pd.factorize(rows[by], sort=True)
+
+    pairs = np.sort(customer_codes.astype(np.int64) * len(keys) + key_codes)
+    starts = np.flatnonzero(_run_starts(pairs))
+    run_lengths = np.diff(np.append(starts, len(pairs)))
+    pair_keys = pairs[starts] % max(len(keys), 1)
+
+    customers = np.bincount(pair_keys, minlength=len(keys))
+    repeat = np.bincount(pair_keys, weights=run_lengths >= 2, minlength=len(keys))
+
+    result = pd.DataFrame(
+        {
+            by: keys,
+            "customers": customers,
+            "repeat_customers": repeat.astype(np.int64),
+        }
+    )
+    result["repeat_rate"] = (result["repeat_customers"] / result["customers"]).round(4)
+    return result.sort_values("repeat_rate", ascending=False).reset_index(drop=True)
+
+
+def cohort_analysis() -> dict:
+    """
+    Build the retention matrix and repeat-purchase rates by region and product.
+
+    Returns
+    -------
+    dict
+        'retention', 'repeat_by_region' and 'repeat_by_product' DataFrames
+        (also written to data/processed/).
+    """
+    df = load_data(resolve_data_path())
+    results = {
+        "retention": retention_matrix(df),
+        "repeat_by_region": repeat_purchase_rates(df, "region"),
+        "repeat_by_product": repeat_purchase_rates(df, "product_name"),
+    }
+    for name, table in results.items():
+        output_path = save_artifact(table, f"cohort_{name}")
+        print(f"Cohort {name.replace('_', ' ')} saved -> {output_path}")
+    return results
+
+
+if __name__ == "__main__":
+    results = cohort_analysis()
+    print(results["retention"].head(12).to_string(index=False))
+    print(results["repeat_by_region"].to_string(index=False))
@@ -0,0 +1,140 @@
+"""
+Per-product, per-period cost model for profit estimates.
+
+Costs come from a local table with one row per product and the month from
+which the costs apply:
+
+    product_id,effective_from,unit_cogs,shipping_per_order,discount_rate
+    P001,2024-01,910.00,25.00,0.05
+
+Amounts are in the base currency. Each entry holds until the product's
+next entry. The table is expanded once into dense (product x month)
+arrays, so costing rows is an integer-coded lookup,
+costs[product_code * n_months + month_index], rather than a merge. The cost
+of a row is:
+
+    cogs          = orders * unit_cogs
+    shipping_cost = orders * shipping_per_order
+    discount      = revenue * discount_rate
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+COST_TABLE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "data", "raw", "cost_table.csv"
+)
+
+COST_FIELDS = ["unit_cogs", "shipping_per_order", "discount_rate"]
+COST_COLUMNS = ["cogs", "shipping_cost", "discount"]
+
+_model_cache = {}
+
+
+class CostModel:
+    """
+    Dense cost lookup tables built from a cost table.
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        Columns product_id, effective_from (month) and COST_FIELDS.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        months = pd.to_datetime(table["effective_from"]).to_numpy(dtype="datetime64[M]").astype(np.int64)
+        self.products = pd.Index(sorted(table["product_id"].unique()))
+        self.first_month = int(months.min())
+        n_months = int(months.max()) - self.first_month + 1
+
+        product_codes = self.products.get_indexer(table["product_id"])
+        month_codes = months - self.first_month
+
+        # Flattened (product x month) tables with a trailing NaN slot that
+        # rows without a cost entry point to.
+        self.n_months = n_months
+        self.arrays = {}
+        for field in COST_FIELDS:
+            dense = np.full((len(self.products), n_months), np.nan)
+            dense[product_codes, month_codes] = table[field].to_numpy(dtype=float)
+            # An entry holds until the product's next one.
+            dense = pd.DataFrame(dense.T).ffill().to_numpy().T
+            self.arrays[field] = np.append(dense.ravel(), np.nan)
+
+    def _cell_index(self, product_ids: pd.Series, dates: pd.Series) -> np.ndarray:
+        """Flat (product, month) position of every row; the NaN slot if unknown."""
+        if isinstance(product_ids.dtype, pd.CategoricalDtype):
+            # Map the categories once instead of hashing every row.
+            product_codes = self.products.get_indexer(product_ids.cat.categories)
+            product_codes = np.append(product_codes, -1)[product_ids.cat.codes.to_numpy()]
+        else:
+            product_codes = self.products.get_indexer(product_ids)
+
+        # Month of each day via a small per-day table; converting every row
+        # straight to datetime64[M] is several times slower.
+        days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+        if len(days) == 0:
+            return np.zeros(0, dtype=np.int64)
+        first_day = days.min()
+        day_months = np.arange(first_day, days.max() + 1).astype("datetime64[D]")
+        day_months = day_months.astype("datetime64[M]").astype(np.int64) - self.first_month
+        month_codes = day_months[days - first_day]
+
+        valid = (product_codes >= 0) & (month_codes >= 0)
+        cells = product_codes * self.n_months + np.minimum(month_codes, self.n_months - 1)
+        return np.where(valid, cells, len(self.products) * self.n_months)
+
+    def lookup(self, product_ids: pd.Series, dates: pd.Series) -> dict:
+        """
+        Cost fields in effect for each row.
+
+        Rows for products missing from the table, or dated before their
+        first entry, get NaN. Dates after the last entry use the latest
+        costs.
+
+        Returns
+        -------
+        dict
+            Field name -> float array aligned with the rows.
+        """
+        cells = self._cell_index(product_ids, dates)
+        return {field: values.take(cells) for field, values in self.arrays.items()}
+
+    def costs(self, df: pd.DataFrame) -> dict:
+        """
+        Cost columns for sales rows with product_id, date, orders and revenue.
+
+        Returns
+        -------
+        dict
+            COST_COLUMNS name -> float array (NaN where no costs are known).
+        """
+        fields = self.lookup(df["product_id"], df["date"])
+        orders = df["orders"].to_numpy(dtype=float)
+        return {
+            "cogs": orders * fields["unit_cogs"],
+            "shipping_cost": orders * fields["shipping_per_order"],
+            "discount": df["revenue"].to_numpy(dtype=float) * fields["discount_rate"],
+        }
+
+
+def load_cost_model(path: str = COST_TABLE_PATH) -> CostModel:
+    """
+    Load the cost model, or None if there is no cost table.
+
+    The model is kept in memory until the file changes, so repeated
+    dataset loads reuse the same lookup arrays.
+    """
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _model_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    table = pd.read_csv(path, dtype={"product_id": str, "effective_from": str})
+    model = CostModel(table)
+    _model_cache[path] = (mtime, model)
+    return model
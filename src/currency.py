@@ -0,0 +1,188 @@
+"""
+Currency normalization for sales rows.
+
+Rows may carry a 'currency' column (see validation.OPTIONAL_COLUMNS); rows
+without one are in the base currency. Daily FX rates come from a local
+file quoted as units of the base currency per unit of foreign currency:
+
+    date,currency,rate
+    2024-01-02,EUR,1.0942
+
+Normalization is a two-step process:
+
+    normalize_currency()  joins rates onto the rows with an as-of merge
+                          (latest rate on or before each sale date) and
+                          converts money columns to the base currency;
+    convert_currency()    re-expresses base-currency rows in a reporting
+                          currency with one rate per distinct date.
+
+The as-of join runs on distinct (date, currency) pairs rather than on
+rows, and re-reporting in another currency never repeats it, so callers
+that cache normalized rows per date range (the dashboard, the analysis
+service) pay only a per-date scalar multiply per currency.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_CURRENCY = "USD"
+
+FX_RATES_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "data", "raw", "fx_rates.csv"
+)
+
+# Columns that scale with the currency; all but revenue come from calculate_kpis.
+MONEY_COLUMNS = [
+    "revenue",
+    "estimated_profit",
+    "average_order_value",
+    "revenue_per_visitor",
+    "cogs",
+    "shipping_cost",
+    "discount",
+]
+
+_rates_cache = {}
+
+
+def load_fx_rates(path: str = FX_RATES_PATH) -> pd.DataFrame:
+    """
+    Load the daily FX table, sorted by date for as-of joins.
+
+    The parsed table is kept in memory until the file changes.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: date, currency, rate (base units per foreign unit).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"FX rates not found: {path}")
+    mtime = os.path.getmtime(path)
+    cached = _rates_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    rates = pd.read_csv(path, parse_dates=["date"], dtype={"currency": str})
+    rates["date"] = rates["date"].astype("datetime64[ns]")
+    rates = rates.dropna().sort_values("date").reset_index(drop=True)
+    _rates_cache[path] = (mtime, rates)
+    return rates
+
+
+def available_currencies(rates: pd.DataFrame = None) -> list:
+    """Base currency followed by every currency in the FX table, if there is one."""
+    if rates is None:
+        if not os.path.exists(FX_RATES_PATH):
+            return [BASE_CURRENCY]
+        rates = load_fx_rates()
+    return [BASE_CURRENCY] + sorted(set(rates["currency"]) - {BASE_CURRENCY})
+
+
+def _asof_rates(dates: pd.Series, currencies: pd.Series, rates: pd.DataFrame) -> np.ndarray:
+    """Latest rate on or before each (date, currency) pair; base currency is 1."""
+    # Caller-built tables may hold other datetime units or be unsorted;
+    # merge_asof needs both keys in one unit and the rates in date order.
+    if rates["date"].dtype != "datetime64[ns]" or not rates["date"].is_monotonic_increasing:
+        rates = rates.assign(date=pd.to_datetime(rates["date"]).astype("datetime64[ns]"))
+        rates = rates.sort_values("date", kind="stable")
+    keys = pd.DataFrame(
+        {"date": dates.astype("datetime64[ns]").to_numpy(), "currency": currencies.to_numpy()}
+    )
+    keys["order"] = np.arange(len(keys))
+    joined = pd.merge_asof(
+        keys.sort_values("date"), rates, on="date", by="currency", direction="backward"
+    ).sort_values("order")
+
+    result = joined["rate"].to_numpy(dtype=float, copy=True)
+    result[joined["currency"].to_numpy() == BASE_CURRENCY] = 1.0
+    missing = np.isnan(result)
+    if missing.any():
+        first = joined[missing].iloc[0]
+        raise ValueError(
+            f"No FX rate for {first['currency']} on or before {first['date']:%Y-%m-%d} "
+            f"({int(missing.sum())} date/currency pairs affected)"
+        )
+    return result
+
+
+def _scale(df: pd.DataFrame, factor: np.ndarray, currency: str) -> pd.DataFrame:
+    df = df.copy()
+    for col in MONEY_COLUMNS:
+        if col in df.columns:
+            df[col] = (df[col].to_numpy() * factor).round(2)
+    df["currency"] = currency
+    return df
+
+
+def normalize_currency(df: pd.DataFrame, rates: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Convert money columns of mixed-currency rows to the base currency.
+
+    Rows without a 'currency' column, or already all in the base currency,
+    are returned unchanged and need no FX file.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows as returned by load_data, with or without KPI columns.
+    rates : pd.DataFrame, optional
+        FX table; loaded from FX_RATES_PATH when needed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows with money columns in the base currency and 'currency' set to
+        BASE_CURRENCY.
+    """
+    if "currency" not in df.columns:
+        return df
+    currencies = df["currency"].fillna(BASE_CURRENCY)
+    if (currencies == BASE_CURRENCY).all():
+        return df if df["currency"].notna().all() else df.assign(currency=BASE_CURRENCY)
+
+    rates = load_fx_rates() if rates is None else rates
+    # Join distinct (date, currency) pairs, then expand back to rows.
+    days = df["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    currency_codes, currency_names = pd.factorize(currencies)
+    pair_codes, pairs = pd.factorize(days * len(currency_names) + currency_codes)
+    pair_rates = _asof_rates(
+        pd.Series((pairs // len(currency_names)).astype("datetime64[D]")),
+        pd.Series(currency_names[pairs % len(currency_names)]),
+        rates,
+    )
+    return _scale(df, pair_rates[pair_codes], BASE_CURRENCY)
+
+
+def convert_currency(df: pd.DataFrame, currency: str, rates: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Re-express base-currency rows in a reporting currency.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows in the base currency (see normalize_currency); mixed-currency
+        rows are normalized first.
+    currency : str
+        Reporting currency code, e.g. 'EUR'.
+    rates : pd.DataFrame, optional
+        FX table; loaded from FX_RATES_PATH when needed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of the rows with money columns in `currency`.
+    """
+    df = normalize_currency(df, rates)
+    if currency == BASE_CURRENCY:
+        return df
+
+    rates = load_fx_rates() if rates is None else rates
+    if currency not in set(rates["currency"]):
+        raise ValueError(f"Unknown currency '{currency}'; no FX rates for it")
+    # One as-of lookup per distinct date, then a per-row take.
+    date_codes, dates = pd.factorize(df["date"])
+    per_date = _asof_rates(pd.Series(dates), pd.Series(currency, index=range(len(dates))), rates)
+    return _scale(df, 1.0 / per_date[date_codes], currency)
@@ -2,56 +2,167 @@ import pandas as pd
 import os
 import logging
 
+from src.partitions import (
+    MANIFEST_FILE,
+    PARTITION_ROOT,
+    filter_date_range,
+    is_partitioned,
+    load_partitions,
+)
+from src.costs import load_cost_model
+from src.currency import normalize_currency
+from src.kpi_calculator import calculate_kpis
+from src.validation import CSV_DTYPES, DEFAULT_QUARANTINE_PATH, ValidationReport, Validator
+
 logger = logging.getLogger(__name__)
 
+RAW_DATA_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
+)
+
 
-def load_data(file_path: str) -> pd.DataFrame:
+def load_data(
+    file_path: str,
+    chunksize: int = None,
+    rules: list = None,
+    quarantine_path: str = DEFAULT_QUARANTINE_PATH,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
     """
     Load sales data from CSV and perform basic cleaning.
 
+    An optional 'customer_id' column is kept when the file carries one
+    (see validation.OPTIONAL_COLUMNS).
+
+    Every chunk is validated against the data quality rule set as it is
+    read; rows failing any rule are dropped and a sample of them is written
+    to `quarantine_path`.
+
+    `file_path` may also be a partition root written by the ingest path
+    (see src.partitions). Only the month partitions overlapping
+    [start, end] are read, and their rows are not re-validated since they
+    were validated on ingest.
+
     Parameters
     ----------
     file_path : str
-        Path to the CSV file containing sales data.
+        Path to the CSV file containing sales data, or a partition root.
+    chunksize : int, optional
+        Read and validate the file in chunks of this many rows.
+    rules : list of Rule, optional
+        Validation rules; defaults to validation.default_rules().
+    quarantine_path : str, optional
+        Where to write the sample of rejected rows. None disables it.
+    start, end : str or datetime, optional
+        Inclusive date range to return.
 
     Returns
     -------
     pd.DataFrame
-        Cleaned DataFrame with parsed dates and no missing values.
+        Cleaned DataFrame with parsed dates and no invalid rows.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Data file not found: {file_path}")
+    df, _ = load_data_with_report(
+        file_path, chunksize, rules, quarantine_path, start=start, end=end
+    )
+    return df
 
-    df = pd.read_csv(file_path)
 
-    # Convert date column to datetime
-    df["date"] = pd.to_datetime(df["date"])
+def load_data_with_report(
+    file_path: str,
+    chunksize: int = None,
+    rules: list = None,
+    quarantine_path: str = DEFAULT_QUARANTINE_PATH,
+    start=None,
+    end=None,
+) -> tuple:
+    """
+    Load and validate sales data, also returning the validation report.
 
-    # Drop rows with any missing values
-    df = df.dropna()
+    Parameters are the same as for load_data.
 
-    # Ensure numeric columns are the right type
-    numeric_cols = ["visitors", "customers", "orders", "revenue"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    Returns
+    -------
+    tuple
+        (DataFrame, ValidationReport)
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Data file not found: {file_path}")
 
-    # Drop any rows that became NaN after coercion
-    df = df.dropna()
+    if is_partitioned(file_path):
+        df = load_partitions(file_path, start, end)
+        logger.info(f"Loaded {len(df)} records from partitions in {file_path}")
+        return df, ValidationReport(rows_checked=len(df))
+
+    validator = Validator(rules)
+    if chunksize:
+        reader = pd.read_csv(file_path, chunksize=chunksize, dtype=CSV_DTYPES)
+        chunks = [validator.validate(c) for c in reader]
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    else:
+        df = validator.validate(pd.read_csv(file_path, dtype=CSV_DTYPES))
+    df = validator.deduplicate(df)
+    df = filter_date_range(df, start, end)
 
     # Sort by date
     df = df.sort_values("date").reset_index(drop=True)
 
-    # Validate data integrity
-    if df["revenue"].min() < 0:
-        logger.warning("Negative revenue values detected in dataset")
-    if df["orders"].min() < 0:
-        logger.warning("Negative order counts detected in dataset")
+    if quarantine_path:
+        validator.write_quarantine(quarantine_path)
+    validator.report.log(f"in {file_path}")
 
     logger.info(f"Loaded {len(df)} records from {file_path}")
+    return df, validator.report
+
+
+def resolve_data_path(raw_path: str = RAW_DATA_PATH) -> str:
+    """
+    Return the partitioned store if one has been ingested, else the raw CSV.
+    """
+    if is_partitioned(PARTITION_ROOT):
+        return PARTITION_ROOT
+    return raw_path
+
+
+def load_enriched(data_path: str = None, start=None, end=None, kpis: bool = True) -> pd.DataFrame:
+    """
+    Load sales rows ready for reporting.
+
+    Every report reads its rows through here, so they all see the same data.
+
+    Parameters
+    ----------
+    data_path : str, optional
+        Sales CSV or partition root; defaults to resolve_data_path().
+    start, end : str or datetime, optional
+        Inclusive date range to return.
+    kpis : bool
+        Add the calculate_kpis columns, costed with the cost model. Without
+        them the rows are only normalized to the base currency.
+
+    Returns
+    -------
+    pd.DataFrame
+        Cleaned rows with money columns in the base currency.
+    """
+    df = normalize_currency(load_data(data_path or resolve_data_path(), start=start, end=end))
+    if kpis:
+        df = calculate_kpis(df, load_cost_model())
     return df
 
 
+def source_mtime(path: str) -> float:
+    """
+    Last-modified time of a data source.
+
+    For a partition root this is the manifest's, which every ingest that
+    changes rows rewrites.
+    """
+    if is_partitioned(path):
+        return os.path.getmtime(os.path.join(path, MANIFEST_FILE))
+    return os.path.getmtime(path)
+
+
 def get_date_range(df: pd.DataFrame) -> tuple:
     """
     Return the min and max dates from the dataset.
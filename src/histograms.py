@@ -0,0 +1,196 @@
+"""
+Additive KPI distributions stored as fixed-bin histograms per cube cell.
+
+Every transaction's average order value, conversion rate and revenue per
+visitor is dropped into a fixed bin, and bin counts are kept per
+date x region x product_id cell. Because the bins never change, histograms
+of any selection (a date range, a region, a product) are just the sum of
+its cells' counts, so medians and percentiles of a filtered view come
+from a few thousand integers instead of a rescan of the rows.
+
+Bins are log-spaced for the skewed money metrics (a $20 charger and a
+$1,300 laptop both get fine relative resolution) and linear for
+conversion rate. Values outside the edges land in an underflow or
+overflow bin. Percentiles are interpolated within their bin, so they are
+accurate to about one bin width (~2% for AOV and revenue per visitor,
+0.001 for conversion rate).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.data_loader import load_enriched
+from src.output_writer import save_artifact
+
+CELL_KEYS = ["date", "region", "product_id"]
+
+BIN_EDGES = {
+    "average_order_value": np.geomspace(1, 100_000, 501),
+    "conversion_rate": np.linspace(0, 1, 1001),
+    "revenue_per_visitor": np.geomspace(0.01, 10_000, 601),
+}
+
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def bin_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Map values to bin numbers.
+
+    Bin 0 is the underflow bin (below edges[0]), bin i covers
+    [edges[i - 1], edges[i]) and bin len(edges) is the overflow bin.
+    """
+    return np.searchsorted(edges, values, side="right").astype(np.int16)
+
+
+def build_histograms(df: pd.DataFrame, metrics: list = None) -> pd.DataFrame:
+    """
+    Bin every row's KPIs and count rows per cell, metric and bin.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows with KPI columns (see calculate_kpis) and the cell keys.
+    metrics : list of str, optional
+        KPI columns to bin; defaults to every metric in BIN_EDGES.
+
+    Returns
+    -------
+    pd.DataFrame
+        Sparse long table indexed by (date, region, product_id) with
+        columns metric, bin and count. Only non-empty bins are stored.
+    """
+    frames = []
+    for metric in metrics or list(BIN_EDGES):
+        values = df[metric].to_numpy(dtype=float)
+        finite = np.isfinite(values)
+        binned = df.loc[finite, CELL_KEYS].assign(bin=bin_index(values[finite], BIN_EDGES[metric]))
+        counts = binned.groupby(CELL_KEYS + ["bin"]).size().rename("count").reset_index()
+        counts.insert(len(CELL_KEYS), "metric", metric)
+        frames.append(counts)
+
+    histograms = pd.concat(frames, ignore_index=True)
+    histograms["count"] = histograms["count"].astype(np.int64)
+    return histograms.set_index(CELL_KEYS)
+
+
+def select_cells(histograms: pd.DataFrame, start=None, end=None, regions=None, product_ids=None) -> pd.DataFrame:
+    """Keep the cells inside a date range and optional region / product selections."""
+    cells = histograms.index
+    mask = np.ones(len(histograms), dtype=bool)
+    if start is not None:
+        mask &= cells.get_level_values("date") >= pd.Timestamp(start)
+    if end is not None:
+        mask &= cells.get_level_values("date") <= pd.Timestamp(end)
+    if regions is not None:
+        mask &= cells.get_level_values("region").isin(regions)
+    if product_ids is not None:
+        mask &= cells.get_level_values("product_id").isin(product_ids)
+    return histograms[mask]
+
+
+def combine(histograms: pd.DataFrame, metric: str) -> np.ndarray:
+    """Sum the bin counts of all cells in `histograms` for one metric."""
+    rows = histograms[histograms["metric"] == metric]
+    return np.bincount(
+        rows["bin"].to_numpy(dtype=np.int64),
+        weights=rows["count"].to_numpy(),
+        minlength=len(BIN_EDGES[metric]) + 1,
+    ).astype(np.int64)
+
+
+def quantiles(counts: np.ndarray, edges: np.ndarray, qs=DEFAULT_QUANTILES) -> np.ndarray:
+    """
+    Quantiles of a binned distribution, interpolated linearly within bins.
+
+    Underflow and overflow bins are treated as the first and last edge.
+    Returns NaN for every quantile of an empty histogram.
+    """
+    qs = np.asarray(qs, dtype=float)
+    total = counts.sum()
+    if total == 0:
+        return np.full(len(qs), np.nan)
+
+    cumulative = np.cumsum(counts)
+    rank = qs * total
+    bins = np.minimum(np.searchsorted(cumulative, rank, side="left"), len(counts) - 1)
+
+    lower = np.concatenate([[edges[0]], edges])[bins]
+    upper = np.concatenate([edges, [edges[-1]]])[bins]
+    before = np.where(bins > 0, cumulative[bins - 1], 0)
+    inside = counts[bins]
+    fraction = np.divide(rank - before, inside, out=np.zeros(len(qs)), where=inside > 0)
+    return lower + fraction * (upper - lower)
+
+
+def histogram_frame(counts: np.ndarray, edges: np.ndarray) -> pd.DataFrame:
+    """Non-empty bins as a table of bin_lower, bin_upper and count, for plotting."""
+    lower = np.concatenate([[-np.inf], edges])
+    upper = np.concatenate([edges, [np.inf]])
+    nonzero = counts > 0
+    return pd.DataFrame(
+        {"bin_lower": lower[nonzero], "bin_upper": upper[nonzero], "count": counts[nonzero]}
+    )
+
+
+def distribution_summary(histograms: pd.DataFrame, qs=DEFAULT_QUANTILES) -> pd.DataFrame:
+    """
+    Row count and quantiles of every metric over the given cells.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per metric with a 'count' column and one column per
+        quantile, e.g. 'p50' for the median.
+    """
+    rows = []
+    for metric, edges in BIN_EDGES.items():
+        counts = combine(histograms, metric)
+        row = {"metric": metric, "count": int(counts.sum())}
+        row.update({f"p{round(q * 100)}": v for q, v in zip(qs, quantiles(counts, edges, qs))})
+        rows.append(row)
+    return pd.DataFrame(rows).round(4)
+
+
+def load_histograms() -> pd.DataFrame:
+    """
+    Cell histograms maintained by the ingest path, or built from the sales rows.
+    """
+    from src.ingest import has_kpi_histograms, load_kpi_histograms
+
+    if has_kpi_histograms():
+        return load_kpi_histograms()
+    return build_histograms(load_enriched())
+
+
+def distribution_analysis() -> pd.DataFrame:
+    """
+    Median and percentiles of AOV, conversion rate and revenue per visitor.
+
+    Returns
+    -------
+    pd.DataFrame
+        Overall quantiles per metric followed by quantiles per region
+        (also written to data/processed/kpi_distribution.csv).
+    """
+    histograms = load_histograms()
+    frames = [distribution_summary(histograms).assign(region="All")]
+    for region in sorted(histograms.index.get_level_values("region").unique()):
+        selection = select_cells(histograms, regions=[region])
+        frames.append(distribution_summary(selection).assign(region=region))
+
+    summary = pd.concat(frames, ignore_index=True)
+    summary = summary[["region"] + [c for c in summary.columns if c != "region"]]
+    output_path = save_artifact(summary, "kpi_distribution")
+    print(f"KPI distribution saved -> {output_path}")
+    return summary
+
+
+if __name__ == "__main__":
+    result = distribution_analysis()
+    print(result.to_string(index=False))
@@ -0,0 +1,385 @@
+"""
+Incremental ingestion with order-id deduplication and upserts.
+
+The upstream feed replays and corrects orders, so the same order_id can
+arrive in several files. Ingestion keeps its state under
+data/processed/store/:
+
+    index/shard=NNN.pkl    order_id -> partition (date, region, product_id)
+                           and row hash, spread over INDEX_SHARDS shards by
+                           a hash of the id
+    sales/                 current rows, one CSV per year/month partition
+                           (see src.partitions)
+    aggregates/            date x region x product_id aggregates in the
+                           base currency, one pickle per month
+    histograms/            per-cell KPI histograms (see src.histograms),
+                           one pickle per month
+    quarantine/            sample of each batch's rejected rows, named
+                           after the batch file
+
+Every piece of state is sharded, so an ingest only reads and writes what
+its batch touches. Incoming ids are looked up in the index shards that can
+hold them, and exact replays are skipped. New and corrected rows are
+merged into their month partitions; only those months (plus the old month
+of an order whose date was corrected) are rewritten, and only the day x
+region x product cells they touch are recomputed, from the rewritten
+month's rows. A one-row correction therefore costs the same however many
+months the store holds. A month with rows but no aggregates or histograms
+(a store written before histograms were kept, or a lost file) is first
+built in full from its partition, so readers never see a fragment of the
+data. load_data() on the sales/ directory returns the current,
+deduplicated dataset.
+"""
+
+import glob
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.currency import normalize_currency
+from src.data_loader import load_data_with_report
+from src.histograms import build_histograms
+from src.kpi_calculator import calculate_kpis
+from src.output_writer import write_atomic
+from src.partitions import partition_keys, read_manifest, read_partition, upsert_partitions
+from src.validation import schema_columns
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "store")
+
+PARTITION_COLUMNS = ["date", "region", "product_id"]
+
+INDEX_SHARDS = 256
+
+# Per-month cell state rebuilt on ingest.
+AGGREGATES = "aggregates"
+HISTOGRAMS = "histograms"
+
+
+@dataclass
+class IngestResult:
+    """Outcome of ingesting one batch."""
+
+    new_rows: int = 0
+    corrected_rows: int = 0
+    replayed_rows: int = 0
+    quarantined_rows: int = 0
+    affected_partitions: list = field(default_factory=list)
+    rewritten_months: list = field(default_factory=list)
+
+
+def index_shards(order_ids) -> np.ndarray:
+    """Index shard number of each order_id."""
+    hashes = pd.util.hash_array(np.asarray(order_ids, dtype=object))
+    return (hashes % INDEX_SHARDS).astype(np.int64)
+
+
+class OrderIndex:
+    """
+    Persistent order_id index, read and written a few shards at a time.
+
+    Backed by a DataFrame indexed by order_id, so membership tests and
+    position lookups for a whole batch are single hash-table probes
+    (Index.get_indexer) rather than per-row Python work. Only the shards
+    that can hold a batch's ids are loaded.
+    """
+
+    COLUMNS = PARTITION_COLUMNS + ["row_hash"]
+
+    def __init__(self, frame: pd.DataFrame = None):
+        if frame is None:
+            dtypes = {"date": "datetime64[ns]", "row_hash": "uint64"}
+            frame = pd.DataFrame(
+                {col: pd.Series(dtype=dtypes.get(col, object)) for col in self.COLUMNS},
+                index=pd.Index([], name="order_id"),
+            )
+        self.frame = frame
+
+    @classmethod
+    def load(cls, index_dir: str, order_ids=None) -> "OrderIndex":
+        """Load the shards holding `order_ids`, or every shard if None."""
+        shards = range(INDEX_SHARDS) if order_ids is None else np.unique(index_shards(order_ids))
+        paths = [_shard_path(index_dir, shard) for shard in shards]
+        frames = [pd.read_pickle(path) for path in paths if os.path.exists(path)]
+        if not frames:
+            return cls()
+        return cls(pd.concat(frames))
+
+    def save(self, index_dir: str, order_ids):
+        """Write back the shards holding `order_ids`."""
+        frame_shards = index_shards(self.frame.index)
+        for shard in np.unique(index_shards(order_ids)):
+            write_atomic(self.frame[frame_shards == shard], _shard_path(index_dir, shard), fmt="pickle")
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __contains__(self, order_id):
+        return order_id in self.frame.index
+
+    def classify(self, batch: pd.DataFrame, row_hash: pd.Series) -> tuple:
+        """
+        Split a batch into new, corrected and replayed rows.
+
+        Returns
+        -------
+        tuple
+            (new_mask, corrected_mask, positions) where positions are the
+            index rows of existing ids (-1 for new ids).
+        """
+        positions = self.frame.index.get_indexer(batch["order_id"])
+        new = positions == -1
+        existing_hash = np.zeros(len(batch), dtype="uint64")
+        existing_hash[~new] = self.frame["row_hash"].to_numpy(dtype="uint64")[positions[~new]]
+        corrected = ~new & (existing_hash != row_hash.to_numpy())
+        return new, corrected, positions
+
+    def upsert(self, rows: pd.DataFrame, row_hash: pd.Series):
+        """Insert or overwrite index entries for the given rows."""
+        entries = rows.set_index("order_id")[PARTITION_COLUMNS].assign(
+            row_hash=row_hash.to_numpy()
+        )[self.COLUMNS]
+        if self.frame.empty:
+            self.frame = entries
+            return
+
+        positions = self.frame.index.get_indexer(entries.index)
+        existing = positions != -1
+        if existing.any():
+            rows_at = positions[existing]
+            for j, col in enumerate(self.COLUMNS):
+                self.frame.iloc[rows_at, j] = entries[col].to_numpy()[existing]
+        if (~existing).any():
+            self.frame = pd.concat([self.frame, entries[~existing]])
+
+
+def _shard_path(index_dir: str, shard: int) -> str:
+    return os.path.join(index_dir, f"shard={shard:03d}.pkl")
+
+
+def _month_path(store_dir: str, kind: str, partition: str) -> str:
+    return os.path.join(store_dir, kind, f"{partition}.pkl")
+
+
+def hash_rows(df: pd.DataFrame) -> pd.Series:
+    """Stable 64-bit content hash of each row's schema columns."""
+    return pd.util.hash_pandas_object(df[schema_columns(df)], index=False)
+
+
+def aggregate_partitions(rows: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate sales rows to date x region x product_id cells."""
+    return rows.groupby(PARTITION_COLUMNS).agg(
+        revenue=("revenue", "sum"),
+        orders=("orders", "sum"),
+        visitors=("visitors", "sum"),
+        customers=("customers", "sum"),
+        transactions=("revenue", "size"),
+    )
+
+
+def ingest_file(file_path: str, store_dir: str = STORE_DIR) -> IngestResult:
+    """
+    Ingest a raw sales file into the deduplicated store.
+
+    Parameters
+    ----------
+    file_path : str
+        Raw CSV with the standard sales schema.
+    store_dir : str
+        Directory holding the index, month partitions and cell state.
+
+    Returns
+    -------
+    IngestResult
+        Counts of new, corrected and replayed rows and the partitions that
+        were re-aggregated.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    index_dir = os.path.join(store_dir, "index")
+    sales_root = os.path.join(store_dir, "sales")
+    _migrate_single_files(store_dir)
+    _backfill_months(store_dir, sales_root)
+
+    # Each batch keeps its own sample of rejects; the main load's sample in
+    # data/processed/ is left alone.
+    quarantine_path = os.path.join(store_dir, "quarantine", os.path.basename(file_path))
+    batch, report = load_data_with_report(file_path, quarantine_path=quarantine_path)
+    batch = batch[schema_columns(batch)]
+    row_hash = hash_rows(batch)
+
+    index = OrderIndex.load(index_dir, batch["order_id"])
+    new, corrected, positions = index.classify(batch, row_hash)
+    changed = new | corrected
+
+    result = IngestResult(
+        new_rows=int(new.sum()),
+        corrected_rows=int(corrected.sum()),
+        replayed_rows=int((~changed).sum()),
+        quarantined_rows=report.rows_quarantined,
+    )
+    if not changed.any():
+        logger.info(f"{file_path}: nothing new ({result.replayed_rows} replayed rows)")
+        return result
+
+    # Partitions touched: where changed rows land now, plus where corrected
+    # rows used to live (a correction may move an order between cells).
+    previous = index.frame.iloc[positions[corrected]][PARTITION_COLUMNS]
+    affected = pd.concat([batch.loc[changed, PARTITION_COLUMNS], previous])
+    affected = pd.MultiIndex.from_frame(affected.drop_duplicates())
+
+    rows = batch[changed]
+    months = upsert_partitions(
+        rows,
+        sales_root,
+        drop_ids=batch.loc[corrected, "order_id"],
+        extra_partitions=set(partition_keys(previous["date"])),
+    )
+    _rebuild_months(store_dir, months, affected)
+
+    # The index is written last: if an earlier step fails, re-ingesting the
+    # file classifies the same rows as changed and rewrites them again.
+    index.upsert(rows, row_hash[changed])
+    index.save(index_dir, rows["order_id"])
+
+    result.affected_partitions = list(affected)
+    result.rewritten_months = list(months)
+    logger.info(
+        f"{file_path}: {result.new_rows} new, {result.corrected_rows} corrected, "
+        f"{result.replayed_rows} replayed; rewrote {len(result.rewritten_months)} "
+        f"months, re-aggregated {len(affected)} partitions"
+    )
+    return result
+
+
+def _rebuild_months(store_dir: str, months: dict, affected: pd.MultiIndex):
+    """
+    Refresh the aggregates and histograms of rewritten months.
+
+    Only the affected cells are recomputed, from the month's current rows;
+    a month without stored state is built in full. Aggregates are kept in
+    the base currency, while partitions keep rows as received, so cells are
+    comparable across regions.
+    """
+    for partition, rows in months.items():
+        for kind, build in _month_builders().items():
+            path = _month_path(store_dir, kind, partition)
+            if rows.empty:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            if os.path.exists(path):
+                stored = pd.read_pickle(path)
+                in_cells = pd.MultiIndex.from_frame(rows[PARTITION_COLUMNS]).isin(affected)
+                refreshed = build(normalize_currency(rows[in_cells]))
+                state = pd.concat([stored[~stored.index.isin(affected)], refreshed])
+            else:
+                state = build(normalize_currency(rows))
+            write_atomic(state.sort_index(), path, fmt="pickle")
+
+
+def _backfill_months(store_dir: str, sales_root: str):
+    """Build the aggregates and histograms of stored months that have none."""
+    for partition in read_manifest(sales_root)["partition"]:
+        missing = {
+            kind: build
+            for kind, build in _month_builders().items()
+            if not os.path.exists(_month_path(store_dir, kind, partition))
+        }
+        if not missing:
+            continue
+        rows = normalize_currency(read_partition(sales_root, partition))
+        for kind, build in missing.items():
+            path = _month_path(store_dir, kind, partition)
+            logger.info(f"Backfilling {path}")
+            write_atomic(build(rows).sort_index(), path, fmt="pickle")
+
+
+def _month_builders() -> dict:
+    return {
+        AGGREGATES: aggregate_partitions,
+        HISTOGRAMS: lambda rows: build_histograms(calculate_kpis(rows)),
+    }
+
+
+def _migrate_single_files(store_dir: str):
+    """Split the single-file index and cell state of older stores into shards."""
+    legacy_index = os.path.join(store_dir, "order_index.pkl")
+    if os.path.exists(legacy_index):
+        index = OrderIndex(pd.read_pickle(legacy_index)[OrderIndex.COLUMNS])
+        index.save(os.path.join(store_dir, "index"), index.frame.index)
+        os.remove(legacy_index)
+
+    for kind, name in ((AGGREGATES, "daily_aggregates.pkl"), (HISTOGRAMS, "kpi_histograms.pkl")):
+        path = os.path.join(store_dir, name)
+        if not os.path.exists(path):
+            continue
+        cells = pd.read_pickle(path)
+        partitions = partition_keys(pd.Series(cells.index.get_level_values("date")))
+        for partition, month in cells.groupby(partitions.to_numpy()):
+            write_atomic(month, _month_path(store_dir, kind, partition), fmt="pickle")
+        os.remove(path)
+
+
+def _month_files(store_dir: str, kind: str) -> list:
+    return sorted(glob.glob(os.path.join(store_dir, kind, "year=*", "month=*.pkl")))
+
+
+def has_daily_aggregates(store_dir: str = STORE_DIR) -> bool:
+    """True once ingest_file has written daily aggregates to the store."""
+    return bool(_month_files(store_dir, AGGREGATES))
+
+
+def load_daily_aggregates(store_dir: str = STORE_DIR, start=None) -> pd.DataFrame:
+    """
+    Load the date x region x product_id aggregates maintained by ingest_file.
+
+    With `start`, only the month files from its month on are read, and rows
+    before it are dropped.
+    """
+    paths = _month_files(store_dir, AGGREGATES)
+    if not paths:
+        raise FileNotFoundError(f"No daily aggregates in {store_dir}; ingest data first")
+    if start is None:
+        return pd.concat([pd.read_pickle(path) for path in paths]).reset_index()
+
+    start = pd.Timestamp(start)
+    first = os.path.join(f"year={start:%Y}", f"month={start:%m}.pkl")
+    selected = [path for path in paths if os.path.join(*path.split(os.sep)[-2:]) >= first]
+    # With nothing left to read, the latest month supplies the empty frame's columns.
+    months = [pd.read_pickle(path) for path in selected] or [pd.read_pickle(paths[-1]).iloc[:0]]
+    aggregates = pd.concat(months).reset_index()
+    return aggregates[aggregates["date"] >= start].reset_index(drop=True)
+
+
+def has_kpi_histograms(store_dir: str = STORE_DIR) -> bool:
+    """True once ingest_file has written KPI histograms to the store."""
+    return bool(_month_files(store_dir, HISTOGRAMS))
+
+
+def kpi_histograms_mtime(store_dir: str = STORE_DIR):
+    """Latest write to the stored KPI histograms, or None if there are none."""
+    paths = _month_files(store_dir, HISTOGRAMS)
+    return max(os.path.getmtime(path) for path in paths) if paths else None
+
+
+def load_kpi_histograms(store_dir: str = STORE_DIR) -> pd.DataFrame:
+    """
+    Load the per-cell KPI histograms maintained by ingest_file.
+    """
+    paths = _month_files(store_dir, HISTOGRAMS)
+    if not paths:
+        raise FileNotFoundError(f"No KPI histograms in {store_dir}; ingest data first")
+    return pd.concat([pd.read_pickle(path) for path in paths])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for path in sys.argv[1:]:
+        print(path, ingest_file(path))
@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
 
+# Profit margin assumed when no cost model (or no cost entry) is available.
+DEFAULT_PROFIT_MARGIN = 0.35
 
-def calculate_kpis(df: pd.DataFrame) -> pd.DataFrame:
+
+def calculate_kpis(df: pd.DataFrame, cost_model=None) -> pd.DataFrame:
     """
     Calculate core sales KPIs from raw sales data.
 
@@ -11,11 +14,17 @@ def calculate_kpis(df: pd.DataFrame) -> pd.DataFrame:
         - average_order_value: revenue / orders
         - customer_acquisition_cost_proxy: visitors / customers
         - revenue_per_visitor: revenue / visitors
+        - estimated_profit: see cost_model
+        - cogs, shipping_cost, discount: only with a cost model
 
     Parameters
     ----------
     df : pd.DataFrame
         Raw sales DataFrame with columns: visitors, orders, revenue, customers.
+    cost_model : costs.CostModel, optional
+        Per-product, per-period costs. Profit is then revenue minus
+        discount, COGS and shipping; rows without a cost entry, and every
+        row when no model is given, use a flat 35% margin.
 
     Returns
     -------
@@ -34,8 +43,16 @@ def calculate_kpis(df: pd.DataFrame) -> pd.DataFrame:
         df["visitors"] / df["customers"]
     ).round(2)
 
-    # Estimated profit margin (simulated at 35% of revenue)
-    df["estimated_profit"] = (df["revenue"] * 0.35).round(2)
+    # Estimated profit: cost model where known, flat margin otherwise
+    flat_profit = df["revenue"].to_numpy(dtype=float) * DEFAULT_PROFIT_MARGIN
+    if cost_model is None:
+        df["estimated_profit"] = flat_profit.round(2)
+    else:
+        costs = cost_model.costs(df)
+        for col, values in costs.items():
+            df[col] = values.round(2)
+        profit = df["revenue"].to_numpy(dtype=float) - sum(costs.values())
+        df["estimated_profit"] = np.where(np.isnan(profit), flat_profit, profit).round(2)
 
     return df
 
@@ -0,0 +1,217 @@
+"""
+Output layer for processed artifacts.
+
+Serializes DataFrames on a background thread pool so computation can
+continue while earlier results are written, and writes every file
+atomically (temp file in the same directory + rename) so readers never
+observe a partially written artifact.
+
+Supported formats: csv, csv.gz, parquet, feather, pickle. Parquet and
+Feather require pyarrow; pickle is meant for internal state that must keep
+its index and dtypes, and also accepts plain Python objects.
+"""
+
+import atexit
+import importlib.util
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "processed")
+
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "pickle": ".pkl",
+}
+
+# mkstemp creates files as 0600; restore the permissions a plain open() would use.
+_umask = os.umask(0)
+os.umask(_umask)
+_FILE_MODE = 0o666 & ~_umask
+
+_default_format = os.environ.get("SALES_OUTPUT_FORMAT", "csv")
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def set_default_format(fmt: str):
+    """Set the format used when save_artifact is called without one."""
+    global _default_format
+    _check_format(fmt)
+    _default_format = fmt
+
+
+def get_default_format() -> str:
+    return _default_format
+
+
+def artifact_path(name: str, fmt: str = None, output_dir: str = PROCESSED_DIR) -> str:
+    """
+    Build the on-disk path for an artifact.
+
+    Parameters
+    ----------
+    name : str
+        Artifact base name without extension, e.g. 'regional_performance'.
+    fmt : str, optional
+        Output format; defaults to the module-wide default.
+    output_dir : str
+        Directory the artifact lives in.
+
+    Returns
+    -------
+    str
+        Full path including the format's extension.
+    """
+    fmt = fmt or _default_format
+    _check_format(fmt)
+    return os.path.join(output_dir, name + FORMAT_EXTENSIONS[fmt])
+
+
+def write_atomic(df, path: str, fmt: str = "csv"):
+    """
+    Write a DataFrame to `path` atomically.
+
+    The data is written to a temporary file in the destination directory and
+    moved into place with os.replace, which is atomic on POSIX and Windows.
+    """
+    _check_format(fmt)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        if fmt == "csv":
+            df.to_csv(tmp_path, index=False)
+        elif fmt == "csv.gz":
+            df.to_csv(tmp_path, index=False, compression="gzip")
+        elif fmt == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        elif fmt == "feather":
+            df.reset_index(drop=True).to_feather(tmp_path)
+        elif fmt == "pickle":
+            with open(tmp_path, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, _FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ArtifactWriter:
+    """
+    Background writer for processed artifacts.
+
+    Parameters
+    ----------
+    max_workers : int
+        Number of writer threads. Serialization in pandas/pyarrow releases
+        the GIL for much of its work, so a few threads overlap well with
+        computation on the main thread.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="artifact-writer"
+        )
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def submit(self, df, path: str, fmt: str = "csv"):
+        """
+        Schedule an atomic write and return its Future.
+
+        A copy of the frame is taken so callers may keep mutating the
+        original while the write is in flight.
+        """
+        _check_format(fmt)
+        future = self._executor.submit(write_atomic, df.copy(), path, fmt)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+        return future
+
+    def flush(self):
+        """Block until every scheduled write has finished, re-raising failures."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as exc:
+                logger.error(f"Failed to write artifact: {exc}")
+                errors.append(exc)
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def get_writer() -> ArtifactWriter:
+    """Return the process-wide writer, creating it on first use."""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = ArtifactWriter()
+            atexit.register(_default_writer.close)
+        return _default_writer
+
+
+def save_artifact(df, name: str, fmt: str = None, output_dir: str = None) -> str:
+    """
+    Schedule a processed artifact to be written in the background.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to write.
+    name : str
+        Artifact base name without extension.
+    fmt : str, optional
+        One of csv, csv.gz, parquet, feather. Defaults to the module-wide
+        default (env var SALES_OUTPUT_FORMAT, else csv).
+    output_dir : str, optional
+        Destination directory; defaults to PROCESSED_DIR.
+
+    Returns
+    -------
+    str
+        The path the artifact will be written to. Call flush() before
+        reading it back in the same process.
+    """
+    fmt = fmt or _default_format
+    path = artifact_path(name, fmt, output_dir or PROCESSED_DIR)
+    get_writer().submit(df, path, fmt)
+    return path
+
+
+def flush():
+    """Wait for all pending artifact writes of the process-wide writer."""
+    if _default_writer is not None:
+        _default_writer.flush()
+
+
+def _check_format(fmt: str):
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported output format '{fmt}'. "
+            f"Choose one of: {', '.join(FORMAT_EXTENSIONS)}"
+        )
+    if fmt in ("parquet", "feather") and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(f"Writing {fmt} output requires pyarrow: pip install pyarrow")
@@ -0,0 +1,174 @@
+"""
+Time-partitioned on-disk layout for sales rows.
+
+Rows are stored one CSV per calendar month:
+
+    <root>/year=2025/month=03/part.csv
+    <root>/_manifest.csv      partition, min_date, max_date, rows
+
+The manifest lets date-range reads skip every partition that cannot
+overlap the requested window without opening it, so a query over one
+quarter reads three files regardless of how much history is stored.
+"""
+
+import os
+
+import pandas as pd
+
+from src.output_writer import write_atomic
+from src.validation import CSV_DTYPES, SCHEMA_COLUMNS, schema_columns
+
+PARTITION_ROOT = os.path.join(
+    os.path.dirname(__file__), "..", "data", "processed", "store", "sales"
+)
+MANIFEST_FILE = "_manifest.csv"
+PART_FILE = "part.csv"
+
+MANIFEST_COLUMNS = ["partition", "min_date", "max_date", "rows"]
+
+
+def partition_keys(dates: pd.Series) -> pd.Series:
+    """Map dates to their 'year=YYYY/month=MM' partition key."""
+    return dates.dt.strftime("year=%Y/month=%m")
+
+
+def is_partitioned(path: str) -> bool:
+    """True if `path` is a partition root with a manifest."""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def read_manifest(root: str = PARTITION_ROOT) -> pd.DataFrame:
+    """
+    Load the partition manifest.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per partition with its date bounds and row count; empty if
+        the root has not been written yet.
+    """
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(
+            {
+                "partition": pd.Series(dtype=str),
+                "min_date": pd.Series(dtype="datetime64[ns]"),
+                "max_date": pd.Series(dtype="datetime64[ns]"),
+                "rows": pd.Series(dtype="int64"),
+            }
+        )
+    return pd.read_csv(path, parse_dates=["min_date", "max_date"])
+
+
+def prune(manifest: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Return the manifest rows whose date span overlaps [start, end]."""
+    keep = pd.Series(True, index=manifest.index)
+    if start is not None:
+        keep &= manifest["max_date"] >= pd.Timestamp(start)
+    if end is not None:
+        keep &= manifest["min_date"] <= pd.Timestamp(end)
+    return manifest[keep]
+
+
+def read_partition(root: str, partition: str) -> pd.DataFrame:
+    return pd.read_csv(
+        os.path.join(root, partition, PART_FILE), parse_dates=["date"], dtype=CSV_DTYPES
+    )
+
+
+def load_partitions(root: str = PARTITION_ROOT, start=None, end=None) -> pd.DataFrame:
+    """
+    Read the rows between `start` and `end` (inclusive) from a partition root.
+
+    Only partitions whose manifest date span overlaps the window are read;
+    rows in boundary partitions are then filtered exactly.
+    """
+    selected = prune(read_manifest(root), start, end)
+    if selected.empty:
+        empty = pd.DataFrame(columns=SCHEMA_COLUMNS)
+        empty["date"] = pd.to_datetime(empty["date"])
+        return empty
+
+    df = pd.concat(
+        [read_partition(root, p) for p in selected["partition"]], ignore_index=True
+    )
+    df = filter_date_range(df, start, end)
+    return df.sort_values("date").reset_index(drop=True)
+
+
+def filter_date_range(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Keep rows with start <= date <= end; either bound may be None."""
+    if start is None and end is None:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["date"] <= pd.Timestamp(end)
+    return df[mask]
+
+
+def upsert_partitions(
+    rows: pd.DataFrame,
+    root: str = PARTITION_ROOT,
+    drop_ids=(),
+    extra_partitions=(),
+) -> list:
+    """
+    Merge rows into their month partitions and rewrite only those partitions.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        New or corrected rows with the standard schema.
+    root : str
+        Partition root directory.
+    drop_ids : iterable of str
+        order_ids to remove before merging (the previous versions of
+        corrected rows).
+    extra_partitions : iterable of str
+        Partition keys to rewrite even if no row lands there, e.g. the old
+        month of an order whose date was corrected.
+
+    Returns
+    -------
+    dict
+        Partition key -> the partition's rows after the upsert, for every
+        rewritten partition (empty if the partition was removed).
+    """
+    keys = partition_keys(rows["date"])
+    touched = sorted(set(keys) | set(extra_partitions))
+    drop_ids = pd.Index(list(drop_ids))
+
+    manifest = read_manifest(root).set_index("partition")
+    rewritten = {}
+    for key in touched:
+        path = os.path.join(root, key, PART_FILE)
+        current = read_partition(root, key) if os.path.exists(path) else None
+        incoming = rows[(keys == key).to_numpy()]
+        if current is not None:
+            current = current[~current["order_id"].isin(drop_ids.append(pd.Index(incoming["order_id"])))]
+            merged = pd.concat([current, incoming], ignore_index=True)
+        else:
+            merged = incoming
+
+        if merged.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            manifest = manifest.drop(index=key, errors="ignore")
+            rewritten[key] = merged
+            continue
+
+        merged = merged.sort_values("date")[schema_columns(merged)].reset_index(drop=True)
+        write_atomic(merged, path)
+        rewritten[key] = merged
+        manifest.loc[key, ["min_date", "max_date", "rows"]] = [
+            merged["date"].min(),
+            merged["date"].max(),
+            len(merged),
+        ]
+
+    manifest = manifest.sort_index().reset_index()
+    manifest["rows"] = manifest["rows"].astype("int64")
+    write_atomic(manifest[MANIFEST_COLUMNS], os.path.join(root, MANIFEST_FILE))
+    return rewritten
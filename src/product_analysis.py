@@ -9,13 +9,13 @@ import pandas as pd
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.data_loader import load_data
-from src.kpi_calculator import calculate_kpis
+from src.data_loader import load_enriched
+from src.output_writer import save_artifact
 
 
-def product_analysis() -> pd.DataFrame:
+def product_summary(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Perform product-level sales analysis.
+    Aggregate KPI-enriched sales rows per product.
 
     Computes aggregated metrics per product:
         - Total revenue and orders
@@ -23,17 +23,16 @@ def product_analysis() -> pd.DataFrame:
         - Revenue share percentage
         - Ranking by revenue
 
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales data with KPI columns already calculated.
+
     Returns
     -------
     pd.DataFrame
         Product summary DataFrame sorted by revenue descending.
     """
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-    )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
-
     product = (
         df.groupby(["product_id", "product_name"])
         .agg(
@@ -58,14 +57,23 @@ def product_analysis() -> pd.DataFrame:
     # Rank by revenue
     product = product.sort_values("revenue", ascending=False).reset_index(drop=True)
     product["rank"] = product.index + 1
+    return product
+
+
+def product_analysis() -> pd.DataFrame:
+    """
+    Perform product-level sales analysis (see product_summary).
+
+    Returns
+    -------
+    pd.DataFrame
+        Product summary DataFrame sorted by revenue descending.
+    """
+    df = load_enriched()
+    product = product_summary(df)
 
     # Save output
-    output_dir = os.path.join(
-        os.path.dirname(__file__), "..", "data", "processed"
-    )
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "product_performance.csv")
-    product.to_csv(output_path, index=False)
+    output_path = save_artifact(product, "product_performance")
 
     print(f"Product performance generated -> {output_path}")
     return product
@@ -9,13 +9,13 @@ import pandas as pd
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.data_loader import load_data
-from src.kpi_calculator import calculate_kpis
+from src.data_loader import load_enriched
+from src.output_writer import save_artifact
 
 
-def regional_analysis() -> pd.DataFrame:
+def regional_summary(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Perform regional sales analysis.
+    Aggregate KPI-enriched sales rows per region.
 
     Computes aggregated metrics per region:
         - Total revenue, orders, visitors, customers
@@ -23,17 +23,16 @@ def regional_analysis() -> pd.DataFrame:
         - Revenue per visitor
         - Market share percentage
 
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales data with KPI columns already calculated.
+
     Returns
     -------
     pd.DataFrame
         Regional summary DataFrame.
     """
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-    )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
-
     regional = (
         df.groupby("region")
         .agg(
@@ -59,14 +58,22 @@ def regional_analysis() -> pd.DataFrame:
     regional["market_share_pct"] = (
         (regional["revenue"] / total_revenue) * 100
     ).round(2)
+    return regional
+
+
+def regional_analysis() -> pd.DataFrame:
+    """
+    Perform regional sales analysis (see regional_summary).
+
+    Returns
+    -------
+    pd.DataFrame
+        Regional summary DataFrame.
+    """
+    regional = regional_summary(load_enriched())
 
     # Save output
-    output_dir = os.path.join(
-        os.path.dirname(__file__), "..", "data", "processed"
-    )
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "regional_performance.csv")
-    regional.to_csv(output_path, index=False)
+    output_path = save_artifact(regional, "regional_performance")
 
     print(f"Regional performance generated -> {output_path}")
     return regional
@@ -82,11 +89,7 @@ def compare_regions(df: pd.DataFrame = None) -> pd.DataFrame:
         Comparison DataFrame with rank by revenue.
     """
     if df is None:
-        data_path = os.path.join(
-            os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-        )
-        df = load_data(data_path)
-        df = calculate_kpis(df)
+        df = load_enriched()
 
     comparison = (
         df.groupby("region")
@@ -0,0 +1,117 @@
+"""
+Hierarchical rollups (GROUPING SETS) computed from a single scan.
+
+The raw rows are grouped once at the finest grain needed by any requested
+grouping set. Every coarser level, down to the grand total, is then derived
+from the smallest already-computed level that contains it, so N summaries
+cost roughly one pass over the data plus a few passes over small
+aggregates.
+
+Means of row-level KPIs are carried as (sum, count) pairs through the
+lattice and only divided at the end, so every level is exact.
+"""
+
+import pandas as pd
+
+SUM_MEASURES = [
+    "revenue",
+    "orders",
+    "visitors",
+    "customers",
+    "estimated_profit",
+    "cogs",
+    "shipping_cost",
+    "discount",
+]
+MEAN_MEASURES = ["conversion_rate", "average_order_value", "revenue_per_visitor"]
+
+# Dimensions that can be requested without existing as columns.
+DERIVED_DIMENSIONS = {
+    "month": lambda df: df["date"].dt.to_period("M").astype(str),
+    "quarter": lambda df: df["date"].dt.to_period("Q").astype(str),
+    "year": lambda df: df["date"].dt.year,
+    "month_num": lambda df: df["date"].dt.month,
+}
+
+
+def rollup(
+    df: pd.DataFrame,
+    grouping_sets: list,
+    sums: list = None,
+    means: list = None,
+) -> dict:
+    """
+    Compute several group-by summaries in one pass over the rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sales rows, typically with KPI columns already calculated.
+    grouping_sets : list of tuple
+        Dimension combinations to return, e.g.
+        [("region",), ("region", "product_name"), ()]. The empty tuple is
+        the grand total. Dimensions may be columns of `df` or one of
+        DERIVED_DIMENSIONS (month, quarter, year, month_num).
+    sums : list of str, optional
+        Columns to total; defaults to the SUM_MEASURES present in `df`.
+    means : list of str, optional
+        Columns to average per row; defaults to the MEAN_MEASURES present.
+
+    Returns
+    -------
+    dict
+        Maps each grouping set (as a tuple) to a DataFrame with the
+        dimension columns, the summed and averaged measures, and a
+        'transactions' row count.
+    """
+    sums = [c for c in (sums or SUM_MEASURES) if c in df.columns]
+    means = [c for c in (means or MEAN_MEASURES) if c in df.columns]
+    grouping_sets = [tuple(s) for s in grouping_sets]
+
+    finest = []
+    for dims in grouping_sets:
+        finest.extend(d for d in dims if d not in finest)
+
+    base = _finest_aggregate(df, finest, sums, means)
+    value_cols = [c for c in base.columns if c not in finest]
+
+    # Coarsest last: each level is derived from the smallest computed superset.
+    levels = {tuple(finest): base}
+    for dims in sorted(set(grouping_sets), key=len, reverse=True):
+        if dims in levels:
+            continue
+        parent = min(
+            (lvl for lvl in levels if set(dims) <= set(lvl)),
+            key=lambda lvl: len(levels[lvl]),
+        )
+        levels[dims] = _aggregate(levels[parent], list(dims), value_cols)
+
+    return {dims: _finalize(levels[dims], dims, sums, means) for dims in grouping_sets}
+
+
+def _finest_aggregate(df, dims, sums, means) -> pd.DataFrame:
+    keys = {d: (df[d] if d in df.columns else DERIVED_DIMENSIONS[d](df)) for d in dims}
+    frame = pd.DataFrame({**keys, **{c: df[c] for c in sums}})
+    for col in means:
+        frame[f"{col}__sum"] = df[col]
+        frame[f"{col}__count"] = df[col].notna().astype("int64")
+    frame["transactions"] = 1
+
+    value_cols = [c for c in frame.columns if c not in dims]
+    return _aggregate(frame, dims, value_cols)
+
+
+def _aggregate(frame: pd.DataFrame, dims: list, value_cols: list) -> pd.DataFrame:
+    if not dims:
+        return pd.DataFrame({c: [frame[c].sum()] for c in value_cols})
+    return frame.groupby(dims, sort=True, observed=True)[value_cols].sum().reset_index()
+
+
+def _finalize(level: pd.DataFrame, dims: tuple, sums: list, means: list) -> pd.DataFrame:
+    out = level[list(dims)].copy()
+    for col in sums:
+        out[col] = level[col].to_numpy()
+    for col in means:
+        out[col] = (level[f"{col}__sum"] / level[f"{col}__count"]).to_numpy()
+    out["transactions"] = level["transactions"].astype("int64").to_numpy()
+    return out.reset_index(drop=True)
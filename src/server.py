@@ -0,0 +1,300 @@
+"""
+Analysis HTTP service.
+Keeps the KPI-enriched dataset warm in memory and serves JSON summaries,
+so internal tools avoid paying interpreter, import and CSV parse costs on
+every request.
+
+Run with:
+    python src/server.py --port 8050
+
+Every endpoint accepts ``currency`` (e.g. ``?currency=EUR``) to report
+money in another currency. The warm dataset is normalized to the base
+currency once at load, so a currency only costs a per-date rate lookup and
+its responses are cached like any other query.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.costs import COST_TABLE_PATH
+from src.currency import FX_RATES_PATH, available_currencies, convert_currency
+from src.data_loader import load_enriched, resolve_data_path, source_mtime
+from src.kpi_calculator import summarize_kpis, top_products_by_revenue
+from src.regional_analysis import compare_regions
+from src.time_analysis import get_best_worst_months, monthly_trends, quarterly_trends
+
+logger = logging.getLogger(__name__)
+
+
+class ParameterError(ValueError):
+    """A query parameter the service cannot use; answered with 400."""
+
+
+class RequestCoalescer:
+    """
+    Collapse identical concurrent requests into a single computation.
+
+    The first caller for a key runs the computation; callers arriving with
+    the same key while it is in flight wait for and share its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def run(self, key, func):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._inflight[key] = call
+
+        if leader:
+            try:
+                call["result"] = func()
+            except Exception as exc:
+                call["error"] = exc
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                call["event"].set()
+        else:
+            call["event"].wait()
+
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+
+class AnalysisService:
+    """
+    Warm dataset plus a bounded cache of computed responses.
+
+    The dataset is rebuilt only when the data source, the cost table or
+    the FX rates change; cached responses are dropped whenever it is.
+    Without an explicit `data_path` the source is re-resolved on every
+    check (see resolve_data_path), so the first ingest switches the
+    service to the partitioned store, and later ingests are picked up
+    through the partition manifest.
+    """
+
+    def __init__(self, data_path: str = None, cache_size: int = 256):
+        self.data_path = data_path
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._df = None
+        self._mtime = None
+        self._cache = OrderedDict()
+        self._coalescer = RequestCoalescer()
+
+    def dataset(self) -> pd.DataFrame:
+        """Return the enriched dataset, reloading it if an input changed."""
+        data_path = self.data_path or resolve_data_path()
+        mtime = (
+            data_path,
+            source_mtime(data_path),
+            _mtime_or_none(COST_TABLE_PATH),
+            _mtime_or_none(FX_RATES_PATH),
+        )
+        with self._lock:
+            if self._df is None or mtime != self._mtime:
+                self._df = load_enriched(data_path)
+                self._mtime = mtime
+                self._cache.clear()
+                logger.info(f"Dataset warmed: {len(self._df)} rows")
+            return self._df
+
+    def query(self, endpoint: str, params: dict):
+        """Return the (cached) response payload for an endpoint."""
+        handler = ENDPOINTS.get(endpoint)
+        if handler is None:
+            raise KeyError(endpoint)
+
+        df = self.dataset()
+        key = (endpoint, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        with self._lock:
+            version = self._mtime
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        def compute():
+            filtered = apply_filters(df, params)
+            if "currency" in params:
+                currency = params["currency"][0].upper()
+                if currency not in available_currencies():
+                    raise ParameterError(f"Unknown currency '{currency}'")
+                filtered = convert_currency(filtered, currency)
+            payload = _to_jsonable(handler(filtered, params))
+            with self._lock:
+                if self._mtime == version:
+                    self._cache[key] = payload
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            return payload
+
+        return self._coalescer.run((version, key), compute)
+
+
+def _mtime_or_none(path: str):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def apply_filters(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Filter the dataset by the common query parameters.
+
+    Supported parameters are ``start`` and ``end`` (ISO dates, inclusive),
+    ``region`` and ``product`` (product name or id). Region and product
+    accept comma-separated or repeated values.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if "start" in params:
+        mask &= (df["date"] >= _date_param(params, "start")).to_numpy()
+    if "end" in params:
+        mask &= (df["date"] <= _date_param(params, "end")).to_numpy()
+    if "region" in params:
+        mask &= df["region"].isin(_split_values(params["region"])).to_numpy()
+    if "product" in params:
+        products = _split_values(params["product"])
+        mask &= (
+            df["product_name"].isin(products) | df["product_id"].isin(products)
+        ).to_numpy()
+    if mask.all():
+        return df
+    return df[mask]
+
+
+def _split_values(values: list) -> list:
+    return [v.strip() for value in values for v in value.split(",") if v.strip()]
+
+
+def _int_param(params: dict, name: str, default: int) -> int:
+    if name not in params:
+        return default
+    try:
+        return int(params[name][0])
+    except ValueError:
+        raise ParameterError(f"Parameter '{name}' must be an integer")
+
+
+def _date_param(params: dict, name: str) -> pd.Timestamp:
+    try:
+        value = pd.Timestamp(params[name][0])
+    except ValueError:
+        value = pd.NaT
+    if value is pd.NaT:
+        raise ParameterError(f"Parameter '{name}' must be an ISO date")
+    return value
+
+
+def _to_jsonable(value):
+    """Convert analysis results (frames, numpy scalars, NaN) to plain JSON types."""
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+ENDPOINTS = {
+    "/summary": lambda df, params: summarize_kpis(df),
+    "/top-products": lambda df, params: top_products_by_revenue(
+        df, n=_int_param(params, "n", 5)
+    ),
+    "/regions": lambda df, params: compare_regions(df),
+    "/best-worst-months": lambda df, params: get_best_worst_months(df),
+    "/trends/monthly": lambda df, params: monthly_trends(df),
+    "/trends/quarterly": lambda df, params: quarterly_trends(df),
+}
+
+
+def make_handler(service: AnalysisService):
+    """Build a request handler class bound to an AnalysisService."""
+
+    class AnalysisRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.rstrip("/") or "/"
+            params = parse_qs(url.query)
+
+            if endpoint == "/health":
+                self._send(200, {"status": "ok"})
+                return
+            if endpoint not in ENDPOINTS:
+                self._send(404, {"error": f"Unknown endpoint: {endpoint}"})
+                return
+            try:
+                payload = service.query(endpoint, params)
+            except ParameterError as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            except Exception:
+                logger.exception(f"Failed to serve {self.path}")
+                self._send(500, {"error": "Internal server error"})
+                return
+            self._send(200, payload)
+
+        def _send(self, status: int, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return AnalysisRequestHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8050, data_path: str = None):
+    """
+    Start the analysis service and block until interrupted.
+
+    The dataset is loaded before the socket starts accepting requests so
+    the first caller already hits a warm cache.
+    """
+    service = AnalysisService(data_path)
+    service.dataset()
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Analysis service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sales analysis HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument(
+        "--data", help="Sales CSV or partition root (default: the ingested store, else the raw CSV)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve(args.host, args.port, args.data)
@@ -1,14 +1,16 @@
 import os
 import sys
+import pandas as pd
 
 # Add project root to path so imports work
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.data_loader import load_data
-from src.kpi_calculator import calculate_kpis, calculate_growth_rate
+from src.data_loader import load_enriched
+from src.kpi_calculator import calculate_growth_rate
+from src.output_writer import save_artifact
 
 
-def monthly_analysis():
+def monthly_analysis(start=None, end=None):
     """
     Perform monthly sales trend analysis grouped by region.
 
@@ -16,15 +18,44 @@ def monthly_analysis():
         - Total revenue and orders per region per month
         - Average conversion rate and average order value
         - Month-over-month revenue growth percentage
+
+    Parameters
+    ----------
+    start, end : str or datetime, optional
+        Restrict the analysis to this inclusive date range. With a
+        partitioned store only the overlapping months are read.
     """
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-    )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
+    df = load_enriched(start=start, end=end)
+
+    monthly = monthly_trends(df)
+
+    # Save output
+    output_path = save_artifact(monthly, _artifact_name("monthly_sales_trends", start, end))
+
+    print(f"Monthly sales trends generated -> {output_path}")
+    print(f"  Rows: {len(monthly)}")
+    print(f"  Date range: {monthly['month'].min()} to {monthly['month'].max()}")
+    print(f"  Regions: {monthly['region'].nunique()}")
+
+    return monthly
+
 
+def monthly_trends(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate KPI-enriched sales data into monthly trends per region.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with KPI columns already calculated.
+
+    Returns
+    -------
+    pd.DataFrame
+        Monthly aggregates per region with month-over-month revenue growth.
+    """
     # Extract month period
-    df["month"] = df["date"].dt.to_period("M").astype(str)
+    df = df.assign(month=df["date"].dt.to_period("M").astype(str))
 
     # Aggregate by month and region
     monthly = (
@@ -52,38 +83,48 @@ def monthly_analysis():
         monthly.groupby("region")["revenue"].pct_change() * 100
     ).round(2)
 
-    # Save output
-    output_dir = os.path.join(
-        os.path.dirname(__file__), "..", "data", "processed"
-    )
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "monthly_sales_trends.csv")
-    monthly.to_csv(output_path, index=False)
-
-    print(f"Monthly sales trends generated -> {output_path}")
-    print(f"  Rows: {len(monthly)}")
-    print(f"  Date range: {monthly['month'].min()} to {monthly['month'].max()}")
-    print(f"  Regions: {monthly['region'].nunique()}")
-
     return monthly
 
 
-def quarterly_analysis() -> pd.DataFrame:
+def quarterly_analysis(start=None, end=None) -> pd.DataFrame:
     """
     Perform quarterly sales trend analysis.
 
+    Parameters
+    ----------
+    start, end : str or datetime, optional
+        Restrict the analysis to this inclusive date range.
+
     Returns
     -------
     pd.DataFrame
         Quarterly aggregated sales data with growth rates.
     """
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-    )
-    df = load_data(data_path)
-    df = calculate_kpis(df)
+    df = load_enriched(start=start, end=end)
+
+    quarterly = quarterly_trends(df)
+
+    output_path = save_artifact(quarterly, _artifact_name("quarterly_sales_trends", start, end))
+
+    print(f"Quarterly sales trends generated -> {output_path}")
+    return quarterly
+
+
+def quarterly_trends(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate KPI-enriched sales data into quarterly trends per region.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with KPI columns already calculated.
 
-    df["quarter"] = df["date"].dt.to_period("Q").astype(str)
+    Returns
+    -------
+    pd.DataFrame
+        Quarterly aggregates per region with growth rates.
+    """
+    df = df.assign(quarter=df["date"].dt.to_period("Q").astype(str))
 
     quarterly = (
         df.groupby(["quarter", "region"])
@@ -102,17 +143,17 @@ def quarterly_analysis() -> pd.DataFrame:
         quarterly.groupby("region")["revenue"].transform(lambda x: x)
     )
 
-    output_dir = os.path.join(
-        os.path.dirname(__file__), "..", "data", "processed"
-    )
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "quarterly_sales_trends.csv")
-    quarterly.to_csv(output_path, index=False)
-
-    print(f"Quarterly sales trends generated -> {output_path}")
     return quarterly
 
 
+def _artifact_name(base: str, start=None, end=None) -> str:
+    """Suffix windowed outputs so they never overwrite the full-history artifact."""
+    if start is None and end is None:
+        return base
+    bounds = [pd.Timestamp(d).strftime("%Y%m%d") if d is not None else "all" for d in (start, end)]
+    return f"{base}_{bounds[0]}_{bounds[1]}"
+
+
 def get_best_worst_months(df: pd.DataFrame = None) -> dict:
     """
     Identify the best and worst performing months by revenue.
@@ -120,16 +161,16 @@ def get_best_worst_months(df: pd.DataFrame = None) -> dict:
     Returns
     -------
     dict
-        Dictionary with 'best_month' and 'worst_month' info.
+        Dictionary with 'best_month' and 'worst_month' info; every value
+        is None when `df` has no rows.
     """
     if df is None:
-        data_path = os.path.join(
-            os.path.dirname(__file__), "..", "data", "raw", "sales_data.csv"
-        )
-        df = load_data(data_path)
+        df = load_enriched(kpis=False)
 
-    df["month"] = df["date"].dt.to_period("M").astype(str)
-    monthly_rev = df.groupby("month")["revenue"].sum()
+    month = df["date"].dt.to_period("M").astype(str).rename("month")
+    monthly_rev = df.groupby(month)["revenue"].sum()
+    if monthly_rev.empty:
+        return dict.fromkeys(["best_month", "best_revenue", "worst_month", "worst_revenue"])
 
     return {
         "best_month": monthly_rev.idxmax(),
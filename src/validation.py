@@ -0,0 +1,260 @@
+"""
+Data quality validation for raw sales data.
+
+Rules are declared once as vectorized checks that return a boolean
+"violation" mask for a chunk. All rules are evaluated together on each
+chunk as it is read, so bad rows are counted, sampled to a quarantine file
+and dropped without a second scan over the data. Uniqueness of order_id
+spans chunks and is checked once on the key column of the combined clean
+rows. Repeated order_ids are reported as violations, but since the
+upstream feed replays and corrects orders, the last occurrence in a load
+is kept and supersedes the earlier ones.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.output_writer import write_atomic
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_COLUMNS = [
+    "date",
+    "order_id",
+    "product_id",
+    "product_name",
+    "region",
+    "visitors",
+    "customers",
+    "orders",
+    "revenue",
+]
+NUMERIC_COLUMNS = ["visitors", "customers", "orders", "revenue"]
+
+# Carried through loading and the partitioned store when present; never required.
+OPTIONAL_COLUMNS = ["customer_id", "currency"]
+
+# Identifiers are read as strings so ids like "00042" keep their leading zeros.
+CSV_DTYPES = {"customer_id": str, "currency": str}
+
+KNOWN_REGIONS = ("North", "South", "East", "West")
+KNOWN_PRODUCT_IDS = tuple(f"P{i:03d}" for i in range(1, 11))
+
+DEFAULT_QUARANTINE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "data", "processed", "quarantine_sample.csv"
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A single data quality rule.
+
+    `check` receives a type-coerced chunk and returns a boolean array that is
+    True for every row violating the rule.
+    """
+
+    name: str
+    description: str
+    check: Callable[[pd.DataFrame], np.ndarray]
+
+
+@dataclass
+class ValidationReport:
+    """Per-rule violation counts and the quarantine sample for one load."""
+
+    rows_checked: int = 0
+    rows_quarantined: int = 0
+    rows_superseded: int = 0
+    violations: dict = field(default_factory=dict)
+    quarantine_path: str = None
+
+    def log(self, source: str = ""):
+        for name, count in self.violations.items():
+            if count:
+                logger.warning(f"Rule '{name}' failed for {count} rows {source}".rstrip())
+        if self.rows_quarantined:
+            logger.warning(
+                f"Quarantined {self.rows_quarantined} of {self.rows_checked} rows"
+                + (f"; sample -> {self.quarantine_path}" if self.quarantine_path else "")
+            )
+        if self.rows_superseded:
+            logger.info(
+                f"{self.rows_superseded} rows superseded by later rows "
+                f"with the same order_id {source}".rstrip()
+            )
+
+
+def default_rules(
+    known_regions=KNOWN_REGIONS,
+    known_product_ids=KNOWN_PRODUCT_IDS,
+    min_date=None,
+    max_date=None,
+) -> list:
+    """
+    Build the standard rule set.
+
+    Parameters
+    ----------
+    known_regions : iterable of str
+        Accepted region names.
+    known_product_ids : iterable of str
+        Accepted product ids.
+    min_date, max_date : str or datetime, optional
+        Inclusive bounds for the transaction date. `max_date` defaults to
+        today, so rows dated in the future are rejected.
+
+    Returns
+    -------
+    list of Rule
+    """
+    regions = pd.Index(list(known_regions))
+    product_ids = pd.Index(list(known_product_ids))
+    min_date = pd.Timestamp(min_date) if min_date is not None else None
+    max_date = (
+        pd.Timestamp(max_date) if max_date is not None else pd.Timestamp.today().normalize()
+    )
+
+    def missing_values(chunk):
+        cols = [c for c in SCHEMA_COLUMNS if c in chunk.columns]
+        return chunk[cols].isna().to_numpy().any(axis=1)
+
+    def negative_measures(chunk):
+        return (chunk[NUMERIC_COLUMNS].to_numpy() < 0).any(axis=1)
+
+    def funnel_order(chunk):
+        customers = chunk["customers"].to_numpy()
+        orders = chunk["orders"].to_numpy()
+        visitors = chunk["visitors"].to_numpy()
+        return (customers > orders) | (orders > visitors)
+
+    def unknown_region(chunk):
+        return (~chunk["region"].isin(regions) & chunk["region"].notna()).to_numpy()
+
+    def unknown_product(chunk):
+        return (~chunk["product_id"].isin(product_ids) & chunk["product_id"].notna()).to_numpy()
+
+    def date_out_of_range(chunk):
+        dates = chunk["date"]
+        mask = dates > max_date
+        if min_date is not None:
+            mask |= dates < min_date
+        return mask.fillna(False).to_numpy(dtype=bool)
+
+    return [
+        Rule("missing_values", "Required field is empty or unparseable", missing_values),
+        Rule("negative_measures", "visitors/customers/orders/revenue < 0", negative_measures),
+        Rule("funnel_order", "Expected customers <= orders <= visitors", funnel_order),
+        Rule("unknown_region", "Region not in the known region list", unknown_region),
+        Rule("unknown_product", "product_id not in the known catalogue", unknown_product),
+        Rule("date_out_of_range", "Transaction date outside the accepted range", date_out_of_range),
+    ]
+
+
+class Validator:
+    """
+    Streaming validator: feed it chunks, collect clean rows and a report.
+
+    Parameters
+    ----------
+    rules : list of Rule, optional
+        Rule set to apply; defaults to default_rules().
+    sample_size : int
+        Maximum number of quarantined rows kept for the sample file. The
+        sample is uniform across all chunks (bottom-k on random keys).
+    seed : int
+        Seed for the sampling keys, so samples are reproducible.
+    """
+
+    KEY_RULE = "duplicate_order_id"
+
+    def __init__(self, rules: list = None, sample_size: int = 1000, seed: int = 0):
+        self.rules = rules if rules is not None else default_rules()
+        self.sample_size = sample_size
+        self.report = ValidationReport(violations={r.name: 0 for r in self.rules})
+        self.report.violations[self.KEY_RULE] = 0
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+
+    def validate(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Coerce types, evaluate every rule on the chunk and return clean rows.
+        """
+        chunk = coerce_types(chunk)
+        masks = np.empty((len(chunk), len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            masks[:, j] = rule.check(chunk)
+
+        bad = masks.any(axis=1)
+        counts = masks.sum(axis=0)
+        for rule, count in zip(self.rules, counts):
+            self.report.violations[rule.name] += int(count)
+        self.report.rows_checked += len(chunk)
+        self.report.rows_quarantined += int(bad.sum())
+
+        if bad.any():
+            names = np.array([r.name for r in self.rules], dtype=object)
+            self._add_to_sample(chunk[bad], [";".join(names[row]) for row in masks[bad]])
+        return chunk[~bad]
+
+    def deduplicate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep only the last row for each order_id in the combined clean rows.
+
+        Later rows are corrections or replays of earlier ones, so the last
+        row wins. The earlier rows still count as duplicate_order_id
+        violations and go to the quarantine sample.
+        """
+        superseded = df["order_id"].duplicated(keep="last").to_numpy()
+        if superseded.any():
+            count = int(superseded.sum())
+            self.report.violations[self.KEY_RULE] += count
+            self.report.rows_quarantined += count
+            self.report.rows_superseded += count
+            self._add_to_sample(df[superseded], self.KEY_RULE)
+            df = df[~superseded]
+        return df
+
+    def write_quarantine(self, path: str = DEFAULT_QUARANTINE_PATH):
+        """
+        Write the quarantine sample if any rows were rejected.
+
+        A clean load writes nothing and removes a sample left at `path` by
+        an earlier load, so the file always describes the latest load.
+        """
+        if self._sample is None or self._sample.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+        sample = self._sample.sort_values("_sample_key").drop(columns="_sample_key")
+        write_atomic(sample, path)
+        self.report.quarantine_path = path
+        return path
+
+    def _add_to_sample(self, rejected: pd.DataFrame, violations):
+        rejected = rejected.assign(
+            violations=violations,
+            _sample_key=self._rng.random(len(rejected)),
+        )
+        sample = rejected if self._sample is None else pd.concat([self._sample, rejected])
+        self._sample = sample.nsmallest(self.sample_size, "_sample_key")
+
+
+def schema_columns(df: pd.DataFrame) -> list:
+    """Required schema columns plus whichever optional columns `df` carries."""
+    return SCHEMA_COLUMNS + [c for c in OPTIONAL_COLUMNS if c in df.columns]
+
+
+def coerce_types(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates and numeric measures, turning unparseable values into NaN/NaT."""
+    chunk = chunk.copy()
+    chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+    return chunk
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts"))
+
+from benchmark_analysis import write_fixture
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-golden",
+        action="store_true",
+        help="Rewrite tests/golden/ from the current outputs instead of comparing",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: time and peak-memory budget checks")
+
+
+@pytest.fixture(scope="session")
+def make_fixture(tmp_path_factory):
+    """Generated sales fixture of a given size, written once per session."""
+    fixtures = {}
+
+    def make(num_rows: int) -> dict:
+        if num_rows not in fixtures:
+            directory = tmp_path_factory.mktemp(f"sales_{num_rows}")
+            fixtures[num_rows] = write_fixture(str(directory), num_rows)
+        return fixtures[num_rows]
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def update_golden(request) -> bool:
+    return request.config.getoption("--update-golden")
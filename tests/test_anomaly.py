@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from src.anomaly import AnomalyConfig, AnomalyDetector, detect
+
+DAYS = pd.date_range("2025-01-01", periods=90, freq="D")
+
+
+def daily_rows(region: str, revenue: np.ndarray, days=DAYS) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date": days,
+            "region": region,
+            "product_id": "P001",
+            "revenue": revenue,
+            "orders": np.full(len(days), 10.0),
+            "visitors": np.full(len(days), 200.0),
+        }
+    )
+
+
+def steady_revenue(n: int = len(DAYS)) -> np.ndarray:
+    return 1000 + 10 * (np.arange(n) % 7)
+
+
+def test_gaps_in_sparse_series_are_not_flagged():
+    # Sales on 2 days out of 3, with a week-long gap in the middle.
+    observed = (np.arange(len(DAYS)) % 3 != 0) & ~np.isin(np.arange(len(DAYS)), range(45, 52))
+    rows = daily_rows("North", steady_revenue()[observed], DAYS[observed])
+
+    anomalies, _ = detect(rows)
+
+    assert anomalies.empty
+
+
+def test_spike_is_flagged_and_incremental_matches_full():
+    revenue = steady_revenue()
+    revenue[70] = 5000
+    rows = pd.concat([daily_rows("North", revenue), daily_rows("South", steady_revenue())])
+
+    full, _ = detect(rows)
+    assert list(zip(full["date"], full["region"], full["metric"], full["direction"])) == [
+        (DAYS[70], "North", "revenue", "spike")
+    ]
+
+    detector = AnomalyDetector()
+    detector.update(rows[rows["date"] < DAYS[60]])
+    incremental = detector.update(rows)
+    pd.testing.assert_frame_equal(incremental, full)
+
+    # One day x one series per tile scores exactly as one tile for everything.
+    tiled, _ = detect(rows, AnomalyConfig(block_cells=1))
+    pd.testing.assert_frame_equal(tiled, full)
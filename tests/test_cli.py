@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+from src import cli, data_loader, output_writer
+
+
+@pytest.fixture
+def processed(tmp_path, monkeypatch):
+    """The shipped CSV as the source, with outputs in a temporary directory."""
+    processed = tmp_path / "processed"
+    monkeypatch.setattr(data_loader, "PARTITION_ROOT", str(tmp_path / "sales"))
+    monkeypatch.setattr(output_writer, "PROCESSED_DIR", str(processed))
+    monkeypatch.setattr(cli, "PROCESSED_DIR", str(processed))
+    yield processed
+    output_writer.flush()
+
+
+def test_cohorts_without_customer_ids_fails_cleanly(processed, capsys):
+    assert cli.main(["cohorts"]) == 1
+    assert capsys.readouterr().err.strip().splitlines() == ["cohort analysis needs a customer_id column"]
+
+
+def test_output_format_comes_from_the_environment(processed, monkeypatch):
+    assert cli.main(["product"]) == 0
+    output_writer.flush()
+    assert os.listdir(processed) == ["product_performance.csv"]
+
+    # output_writer reads SALES_OUTPUT_FORMAT at import.
+    monkeypatch.setenv("SALES_OUTPUT_FORMAT", "csv.gz")
+    monkeypatch.setattr(output_writer, "_default_format", "csv.gz")
+    assert cli.main(["product"]) == 0
+    output_writer.flush()
+    assert sorted(os.listdir(processed)) == ["product_performance.csv", "product_performance.csv.gz"]
+
+
+def test_summary_is_written_atomically_and_served_from_cache(processed):
+    summary = cli.run_summary(refresh=True)
+    assert os.listdir(processed) == [cli.SUMMARY_FILE]
+    with open(processed / cli.SUMMARY_FILE, encoding="utf-8") as f:
+        assert json.load(f) == summary
+    assert cli.run_summary() == summary
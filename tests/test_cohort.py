@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_data
+from src.cohort import assign_cohorts, repeat_purchase_rates, retention_matrix
+
+
+@pytest.fixture(scope="module")
+def sales():
+    """Generated orders with customer ids; every 50th row has none."""
+    df = pd.DataFrame(generate_data.generate_sales_data(num_rows=3_000, with_customer_ids=True))
+    df["date"] = pd.to_datetime(df["date"])
+    df.loc[df.index[::50], "customer_id"] = None
+    return df
+
+
+def brute_force_retention(df: pd.DataFrame, normalize: bool) -> pd.DataFrame:
+    rows = df[df["customer_id"].notna()]
+    month = rows["date"].dt.year * 12 + rows["date"].dt.month - 1
+    active = pd.DataFrame({"customer_id": rows["customer_id"], "month": month}).drop_duplicates()
+    active["cohort"] = active.groupby("customer_id")["month"].transform("min")
+    active["offset"] = active["month"] - active["cohort"]
+
+    counts = active.groupby(["cohort", "offset"]).size().unstack(fill_value=0)
+    counts = counts.reindex(columns=range(counts.columns.max() + 1), fill_value=0)
+    sizes = counts[0].to_numpy()
+    matrix = (counts.div(sizes, axis=0).round(4) if normalize else counts).reset_index(drop=True)
+    observable = month.max() - counts.index.to_numpy()
+    matrix = matrix.mask(np.arange(matrix.shape[1])[None, :] > observable[:, None])
+    matrix.insert(0, "cohort_size", sizes)
+    matrix.insert(0, "cohort", [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in counts.index])
+    matrix.columns = list(matrix.columns)
+    return matrix
+
+
+def test_assign_cohorts_matches_first_purchase_month(sales):
+    first = sales.groupby("customer_id")["date"].transform("min").dt.strftime("%Y-%m")
+    expected = first.where(sales["customer_id"].notna()).rename("cohort").astype(object)
+
+    pd.testing.assert_series_equal(assign_cohorts(sales), expected)
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_retention_matrix_matches_groupby(sales, normalize):
+    result = retention_matrix(sales, normalize=normalize)
+    expected = brute_force_retention(sales, normalize)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    # The latest cohort has only its first month to observe.
+    assert result.iloc[-1, 3:].isna().all() and result.iloc[0, 2:].notna().all()
+
+
+@pytest.mark.parametrize("by", ["region", "product_name"])
+def test_repeat_purchase_rates_match_groupby(sales, by):
+    orders = sales[sales["customer_id"].notna()].groupby([by, "customer_id"]).size()
+    expected = pd.DataFrame(
+        {
+            "customers": orders.groupby(level=by).size(),
+            "repeat_customers": (orders >= 2).groupby(level=by).sum(),
+        }
+    ).reset_index()
+    expected["repeat_rate"] = (expected["repeat_customers"] / expected["customers"]).round(4)
+
+    result = repeat_purchase_rates(sales, by)
+    pd.testing.assert_frame_equal(
+        result.sort_values(by).reset_index(drop=True),
+        expected.sort_values(by).reset_index(drop=True),
+        check_dtype=False,
+    )
+    assert result["repeat_rate"].is_monotonic_decreasing
+
+
+def test_empty_input(sales):
+    empty = sales.iloc[:0]
+
+    assert assign_cohorts(empty).empty
+    assert list(retention_matrix(empty).columns) == ["cohort", "cohort_size"]
+    assert repeat_purchase_rates(empty)["customers"].sum() == 0
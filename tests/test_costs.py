@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_data
+from src.costs import COST_FIELDS, CostModel
+from src.kpi_calculator import DEFAULT_PROFIT_MARGIN, calculate_kpis
+
+
+@pytest.fixture(scope="module")
+def table():
+    """The generated cost table, with P002's entries starting a period later."""
+    table = pd.DataFrame(generate_data.generate_cost_table())
+    return table.drop(table.index[(table["product_id"] == "P002")][:1]).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    """Every product plus an unknown one, daily from before the first entry to after the last."""
+    days = pd.date_range("2023-11-15", "2026-03-15", freq="5D")
+    products = [p["id"] for p in generate_data.PRODUCTS] + ["P999"]
+    grid = pd.MultiIndex.from_product([products, days], names=["product_id", "date"])
+    return grid.to_frame(index=False)
+
+
+def merge_asof_costs(rows: pd.DataFrame, table: pd.DataFrame) -> pd.DataFrame:
+    """Entry in effect for each row's month: the product's latest one at or before it."""
+    month = rows["date"].dt.to_period("M").dt.to_timestamp()
+    left = rows.assign(month=month, order=np.arange(len(rows)))
+    right = table.assign(month=pd.to_datetime(table["effective_from"]))
+    joined = pd.merge_asof(
+        left.sort_values("month"),
+        right.sort_values("month")[["product_id", "month"] + COST_FIELDS],
+        on="month",
+        by="product_id",
+        direction="backward",
+    )
+    return joined.sort_values("order").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("categorical", [False, True], ids=["str", "category"])
+def test_lookup_matches_merge_asof(table, rows, categorical):
+    product_ids = rows["product_id"].astype("category") if categorical else rows["product_id"]
+    fields = CostModel(table).lookup(product_ids, rows["date"])
+    expected = merge_asof_costs(rows, table)
+
+    for field in COST_FIELDS:
+        np.testing.assert_array_equal(fields[field], expected[field].to_numpy(), err_msg=field)
+
+    unit_cogs = pd.Series(fields["unit_cogs"])
+    assert unit_cogs[rows["product_id"] == "P999"].isna().all()
+    assert unit_cogs[rows["date"] < "2024-01-01"].isna().all()
+    assert unit_cogs[(rows["product_id"] == "P002") & (rows["date"] < "2024-11-01")].isna().all()
+    assert unit_cogs[(rows["product_id"] == "P001") & (rows["date"] > "2026-01-01")].notna().all()
+
+
+def test_rows_without_costs_fall_back_to_the_flat_margin(table, rows):
+    sales = rows.assign(orders=2, visitors=100, customers=2, revenue=1000.0)
+    result = calculate_kpis(sales, CostModel(table))
+
+    unknown = result["cogs"].isna()
+    assert unknown.any() and not unknown.all()
+    assert (result.loc[unknown, "estimated_profit"] == 1000.0 * DEFAULT_PROFIT_MARGIN).all()
+    known = result[~unknown]
+    np.testing.assert_allclose(
+        known["estimated_profit"],
+        (known["revenue"] - known["cogs"] - known["shipping_cost"] - known["discount"]).round(2),
+        atol=0.011,
+    )
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from src.currency import convert_currency, normalize_currency
+
+# Friday and Monday rates only: the weekend has none.
+RATES = pd.DataFrame(
+    {
+        "date": pd.to_datetime(["2024-01-05", "2024-01-08", "2024-01-05", "2024-01-08"]),
+        "currency": ["EUR", "EUR", "GBP", "GBP"],
+        "rate": [1.10, 1.20, 1.25, 1.30],
+    }
+)
+
+
+def sales(dates, currencies, revenue):
+    return pd.DataFrame(
+        {"date": pd.to_datetime(dates), "currency": currencies, "revenue": revenue}
+    )
+
+
+def test_rates_apply_as_of_the_latest_earlier_date():
+    df = sales(
+        ["2024-01-05", "2024-01-06", "2024-01-07", "2024-01-08", "2024-01-09", "2024-01-06"],
+        ["EUR", "EUR", "GBP", "EUR", "GBP", "USD"],
+        [100.0] * 6,
+    )
+
+    result = normalize_currency(df, RATES)
+
+    assert list(result["revenue"]) == [110.0, 110.0, 125.0, 120.0, 130.0, 100.0]
+    assert (result["currency"] == "USD").all()
+
+
+def test_caller_built_rates_in_any_datetime_unit_and_order():
+    df = sales(["2024-01-06"], ["EUR"], [100.0])
+    rates = RATES.iloc[::-1].assign(date=RATES["date"].astype("datetime64[us]"))
+
+    assert normalize_currency(df, rates)["revenue"].tolist() == [110.0]
+
+
+def test_sale_before_the_first_rate_is_an_error():
+    df = sales(["2024-01-04", "2024-01-06"], ["EUR", "EUR"], [100.0, 100.0])
+
+    with pytest.raises(ValueError, match="No FX rate for EUR on or before 2024-01-04"):
+        normalize_currency(df, RATES)
+
+
+def test_convert_currency_round_trips():
+    df = normalize_currency(
+        sales(["2024-01-05", "2024-01-06", "2024-01-09"], ["EUR", "GBP", "USD"], [100.0, 200.0, 300.0]),
+        RATES,
+    )
+
+    in_gbp = convert_currency(df, "GBP", RATES)
+    assert (in_gbp["currency"] == "GBP").all()
+    assert in_gbp["revenue"].tolist() == pytest.approx([88.0, 200.0, 230.77], abs=0.01)
+
+    back = convert_currency(in_gbp, "USD", RATES)
+    pd.testing.assert_series_equal(back["revenue"], df["revenue"], atol=0.02)
+    with pytest.raises(ValueError, match="Unknown currency 'JPY'"):
+        convert_currency(df, "JPY", RATES)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from src.forecasting import holt_winters
+
+SEASONAL = np.array([4, 4, 24, -4, -4, -4, -4, -4, -4, -4, -4, 0], dtype=float)
+
+
+def test_holt_winters_is_exact_on_noiseless_trend_and_season():
+    t = np.arange(24)
+    values = (100 + 2 * t + SEASONAL[t % 12])[None, :]
+
+    forecasts, _ = holt_winters(values, horizon=3)
+
+    np.testing.assert_allclose(forecasts, [[152, 154, 176]])
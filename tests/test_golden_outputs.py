@@ -0,0 +1,58 @@
+"""
+Processed artifacts compared against golden results.
+
+Every size is generated with the same seed, so the outputs only change
+when the analysis does. After an intentional change, review the diff of
+`pytest --update-golden`.
+"""
+
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from benchmark_analysis import ARTIFACTS, run_pipeline, write_fixture
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+GOLDEN_SIZES = [1_000, 10_000, 100_000]
+
+# Outputs are rounded to cents, so reordered float sums may flip the last
+# digit; anything larger is a real change.
+RTOL = 1e-9
+ATOL = 0.011
+
+
+@pytest.fixture(scope="module", params=GOLDEN_SIZES, ids=lambda n: f"{n}rows")
+def outputs(request, make_fixture):
+    return request.param, run_pipeline(make_fixture(request.param))
+
+
+def as_artifact(df: pd.DataFrame) -> pd.DataFrame:
+    """Round-trip through CSV as save_artifact does, so dtypes match the golden file."""
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+
+@pytest.mark.parametrize("step", list(ARTIFACTS))
+def test_matches_golden(outputs, step, update_golden):
+    num_rows, results = outputs
+    path = os.path.join(GOLDEN_DIR, str(num_rows), f"{ARTIFACTS[step]}.csv")
+    if update_golden:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        results[step].to_csv(path, index=False)
+        pytest.skip(f"golden rewritten: {path}")
+
+    assert os.path.exists(path), f"No golden file {path}; run pytest --update-golden"
+    pd.testing.assert_frame_equal(
+        as_artifact(results[step]),
+        pd.read_csv(path),
+        check_exact=False,
+        rtol=RTOL,
+        atol=ATOL,
+    )
+
+
+def test_fixture_is_deterministic(make_fixture, tmp_path):
+    again = write_fixture(str(tmp_path), GOLDEN_SIZES[0])
+    with open(make_fixture(GOLDEN_SIZES[0])["sales_path"], "rb") as a, open(again["sales_path"], "rb") as b:
+        assert a.read() == b.read()
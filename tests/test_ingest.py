@@ -0,0 +1,139 @@
+import glob
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import generate_data
+from src.data_loader import load_data
+from src.histograms import build_histograms
+from src.ingest import (
+    OrderIndex,
+    aggregate_partitions,
+    index_shards,
+    ingest_file,
+    load_daily_aggregates,
+    load_kpi_histograms,
+)
+from src.kpi_calculator import calculate_kpis
+from src.validation import DEFAULT_QUARANTINE_PATH
+
+CELL_KEYS = ["date", "region", "product_id"]
+
+
+@pytest.fixture
+def sales(tmp_path):
+    """An initial file of 1,500 orders and a later file correcting 40 of them."""
+    rows = generate_data.generate_sales_data(num_rows=1_500)
+    corrections = []
+    for i, row in enumerate(rows[::37]):
+        row = dict(row, revenue=round(row["revenue"] * 1.1, 2))
+        if i % 3 == 0:
+            row["date"] = "2025-06-15"
+        corrections.append(row)
+
+    paths = {"initial": tmp_path / "initial.csv", "corrections": tmp_path / "corrections.csv"}
+    generate_data.write_csv(paths["initial"], rows)
+    generate_data.write_csv(paths["corrections"], corrections)
+    return {name: str(path) for name, path in paths.items()}
+
+
+def sorted_cells(df: pd.DataFrame, by: list) -> pd.DataFrame:
+    """Cell-indexed or flat table as a flat table in a fixed order."""
+    if df.index.names != [None]:
+        df = df.reset_index()
+    return df.sort_values(by).reset_index(drop=True)
+
+
+def assert_state_matches(store: str, current: pd.DataFrame):
+    """Stored aggregates and histograms equal a full build from the current rows."""
+    pd.testing.assert_frame_equal(
+        sorted_cells(load_daily_aggregates(store), CELL_KEYS),
+        sorted_cells(aggregate_partitions(current), CELL_KEYS),
+    )
+    by = CELL_KEYS + ["metric", "bin"]
+    pd.testing.assert_frame_equal(
+        sorted_cells(load_kpi_histograms(store), by),
+        sorted_cells(build_histograms(calculate_kpis(current)), by),
+    )
+
+
+def test_incremental_state_matches_full_rebuild(sales, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_file(sales["initial"], store)
+    result = ingest_file(sales["corrections"], store)
+    replay = ingest_file(sales["corrections"], store)
+
+    assert (result.new_rows, result.corrected_rows) == (0, 41)
+    assert replay.replayed_rows == 41 and not replay.rewritten_months
+
+    current = load_data(os.path.join(store, "sales"), quarantine_path=None)
+    assert len(current) == 1_500 and current["order_id"].is_unique
+    assert_state_matches(store, current)
+
+
+def test_ingest_backfills_months_without_histograms(sales, tmp_path):
+    # A store written before histograms were kept, missing one aggregate file too.
+    store = str(tmp_path / "store")
+    ingest_file(sales["initial"], store)
+    shutil.rmtree(os.path.join(store, "histograms"))
+    os.remove(sorted(glob.glob(os.path.join(store, "aggregates", "year=*", "month=*.pkl")))[0])
+
+    # A one-row correction rewrites a single month; every other month is backfilled.
+    correction = tmp_path / "correction.csv"
+    pd.read_csv(sales["corrections"]).tail(1).to_csv(correction, index=False)
+    result = ingest_file(str(correction), store)
+    assert len(result.rewritten_months) == 1
+    current = load_data(os.path.join(store, "sales"), quarantine_path=None)
+    assert_state_matches(store, current)
+
+
+def test_ingest_loads_only_the_batch_index_shards(sales, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_file(sales["initial"], store)
+
+    ids = pd.read_csv(sales["corrections"])["order_id"]
+    index = OrderIndex.load(os.path.join(store, "index"), ids)
+    assert set(index_shards(index.frame.index)) == set(index_shards(ids))
+    assert len(index) < 1_500
+    assert index.frame.index.isin(ids).sum() == len(ids)
+
+
+def test_aggregates_from_a_start_date_read_only_later_months(sales, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_file(sales["initial"], store)
+    full = load_daily_aggregates(store)
+    start = full["date"].max() - pd.Timedelta(days=40)
+
+    # Earlier months are never opened.
+    paths = glob.glob(os.path.join(store, "aggregates", "year=*", "month=*.pkl"))
+    first = f"year={start:%Y}/month={start:%m}.pkl"
+    earlier = [p for p in paths if os.path.join(*p.split(os.sep)[-2:]) < first]
+    assert earlier
+    for path in earlier:
+        with open(path, "wb") as f:
+            f.write(b"not a pickle")
+
+    pd.testing.assert_frame_equal(
+        load_daily_aggregates(store, start=start),
+        full[full["date"] >= start].reset_index(drop=True),
+    )
+
+
+def test_batch_rejects_are_quarantined_in_the_store(sales, tmp_path):
+    store = str(tmp_path / "store")
+    batch = pd.read_csv(sales["corrections"])
+    batch.loc[0, "region"] = "Atlantis"
+    batch.to_csv(tmp_path / "batch.csv", index=False)
+    def main_sample():
+        return os.path.exists(DEFAULT_QUARANTINE_PATH) and os.path.getmtime(DEFAULT_QUARANTINE_PATH)
+
+    before = main_sample()
+
+    result = ingest_file(str(tmp_path / "batch.csv"), store)
+
+    assert result.quarantined_rows == 1 and result.new_rows == len(batch) - 1
+    sample = pd.read_csv(os.path.join(store, "quarantine", "batch.csv"))
+    assert list(sample["violations"]) == ["unknown_region"]
+    assert main_sample() == before
@@ -0,0 +1,33 @@
+"""
+Per-step time and peak-memory budgets (see scripts/benchmark_analysis.py).
+
+Set PERF_BUDGET_SCALE to loosen every budget on a slow machine, or skip
+these checks with `pytest -m "not perf"`.
+"""
+
+import os
+
+import pytest
+
+from benchmark_analysis import BENCHMARK_ROWS, BUDGETS, benchmark, over_budget, pipeline_steps
+
+pytestmark = pytest.mark.perf
+
+SCALE = float(os.environ.get("PERF_BUDGET_SCALE", 1.0))
+
+
+@pytest.fixture(scope="module")
+def measurements(make_fixture):
+    rows = benchmark(make_fixture(BENCHMARK_ROWS))
+    return {row["step"]: row for row in rows}
+
+
+def test_every_step_has_a_budget(make_fixture):
+    steps = [name for name, _, _ in pipeline_steps(make_fixture(1_000))]
+    assert sorted(steps) == sorted(BUDGETS)
+
+
+@pytest.mark.parametrize("step", list(BUDGETS))
+def test_within_budget(measurements, step):
+    failures = over_budget(measurements[step], SCALE)
+    assert not failures, f"{step} over budget at {BENCHMARK_ROWS:,} rows: {', '.join(failures)}"
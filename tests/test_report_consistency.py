@@ -0,0 +1,64 @@
+"""
+Every report reads the same data: the ingested store once there is one.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import generate_data
+from src import analysis, cli, data_loader, output_writer
+from src.ingest import ingest_file
+from src.product_analysis import product_analysis
+from src.regional_analysis import compare_regions, regional_analysis
+from src.server import AnalysisService
+from src.time_analysis import monthly_analysis, quarterly_analysis
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """An empty store and output directory in place of data/processed/."""
+    store_dir = tmp_path / "store"
+    processed = tmp_path / "processed"
+    monkeypatch.setattr(data_loader, "PARTITION_ROOT", str(store_dir / "sales"))
+    monkeypatch.setattr(output_writer, "PROCESSED_DIR", str(processed))
+    monkeypatch.setattr(cli, "PROCESSED_DIR", str(processed))
+    yield {"store_dir": str(store_dir), "processed": str(processed), "tmp": tmp_path}
+    output_writer.flush()
+
+
+def report_totals(processed: str) -> dict:
+    analysis.main()
+    output_writer.flush()
+    region_summary = pd.read_csv(os.path.join(processed, "region_performance_summary.csv"))
+    return {
+        "regional": regional_analysis()["revenue"].sum(),
+        "compare_regions": compare_regions()["revenue"].sum(),
+        "product": product_analysis()["revenue"].sum(),
+        "monthly": monthly_analysis()["revenue"].sum(),
+        "quarterly": quarterly_analysis()["revenue"].sum(),
+        "analysis": region_summary["total_revenue"].sum(),
+        "summary": cli.run_summary(refresh=True)["total_revenue"],
+    }
+
+
+def test_reports_agree_after_ingesting_a_correction(store):
+    rows = generate_data.generate_sales_data(num_rows=500)
+    correction = dict(rows[250], revenue=round(rows[250]["revenue"] + 1000, 2))
+    initial = store["tmp"] / "initial.csv"
+    corrections = store["tmp"] / "corrections.csv"
+    generate_data.write_csv(initial, rows)
+    generate_data.write_csv(corrections, [correction])
+
+    ingest_file(str(initial), store["store_dir"])
+    service = AnalysisService()
+    before = service.query("/summary", {})["total_revenue"]
+
+    ingest_file(str(corrections), store["store_dir"])
+    expected = round(sum(r["revenue"] for r in rows) + 1000, 2)
+
+    totals = report_totals(store["processed"])
+    totals["server"] = service.query("/summary", {})["total_revenue"]
+    assert totals == pytest.approx({name: expected for name in totals}, abs=0.01)
+    assert before == pytest.approx(expected - 1000, abs=0.01)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+import generate_data
+from src.costs import load_cost_model
+from src.kpi_calculator import calculate_kpis
+from src.rollup import DERIVED_DIMENSIONS, MEAN_MEASURES, SUM_MEASURES, rollup
+
+GROUPING_SETS = [
+    ("region", "product_name", "month"),
+    ("region", "month"),
+    ("region",),
+    ("quarter",),
+    (),
+]
+
+
+@pytest.fixture(scope="module")
+def sales():
+    """KPI rows with scattered missing conversion rates and one region without RPV."""
+    df = pd.DataFrame(generate_data.generate_sales_data(num_rows=2_000))
+    df["date"] = pd.to_datetime(df["date"])
+    df = calculate_kpis(df, load_cost_model())
+    df.loc[df.index[::7], "conversion_rate"] = float("nan")
+    df.loc[df["region"] == "North", "revenue_per_visitor"] = float("nan")
+    return df
+
+
+def direct_groupby(df: pd.DataFrame, dims: tuple) -> pd.DataFrame:
+    df = df.assign(**{d: DERIVED_DIMENSIONS[d](df) for d in dims if d in DERIVED_DIMENSIONS})
+    agg = {c: "sum" for c in SUM_MEASURES} | {c: "mean" for c in MEAN_MEASURES}
+    if not dims:
+        totals = df[list(agg)].agg(agg).to_frame().T
+        return totals.assign(transactions=len(df))
+    grouped = df.groupby(list(dims))
+    return grouped.agg(agg).assign(transactions=grouped.size()).reset_index()
+
+
+def test_every_level_matches_a_direct_groupby(sales):
+    levels = rollup(sales, GROUPING_SETS)
+
+    assert list(levels) == GROUPING_SETS
+    for dims in GROUPING_SETS:
+        pd.testing.assert_frame_equal(
+            levels[dims], direct_groupby(sales, dims), check_dtype=False, obj=str(dims)
+        )
+    north = levels[("region",)].set_index("region").loc["North"]
+    assert pd.isna(north["revenue_per_visitor"]) and north["transactions"] > 0
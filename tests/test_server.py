@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src import data_loader, server
+from src.server import AnalysisService, RequestCoalescer, make_handler
+
+
+class CountingEvent(threading.Event):
+    """Event that counts the threads waiting on it."""
+
+    waiting = 0
+    lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        with CountingEvent.lock:
+            CountingEvent.waiting += 1
+        return super().wait(timeout)
+
+
+def test_concurrent_identical_requests_compute_once(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(server.threading, "Event", CountingEvent)
+    monkeypatch.setattr(CountingEvent, "waiting", 0)
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return {"total": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.run("key", compute)))]
+    threads[0].start()
+    started.wait()
+    threads += [
+        threading.Thread(target=lambda: results.append(coalescer.run("key", compute)))
+        for _ in range(7)
+    ]
+    for thread in threads[1:]:
+        thread.start()
+    # Every follower is blocked on the leader's call before it finishes.
+    deadline = time.monotonic() + 5
+    while CountingEvent.waiting < 7 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"total": 42}] * 8
+    assert coalescer.run("key", lambda: "again") == "again"
+
+
+@pytest.fixture
+def base_url(tmp_path, monkeypatch):
+    """The service over the shipped CSV, on a free local port."""
+    monkeypatch.setattr(data_loader, "PARTITION_ROOT", str(tmp_path / "sales"))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(AnalysisService()))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url: str) -> tuple:
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.load(exc)
+
+
+def test_status_codes(base_url):
+    status, payload = get(f"{base_url}/best-worst-months?start=2030-01-01")
+    assert status == 200
+    assert set(payload.values()) == {None}
+
+    assert get(f"{base_url}/best-worst-months?start=someday")[0] == 400
+    assert get(f"{base_url}/top-products?n=five")[0] == 400
+    assert get(f"{base_url}/summary?currency=XYZ")[0] == 400
+    assert get(f"{base_url}/nowhere")[0] == 404
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from src.data_loader import load_data_with_report
+
+HEADER = "date,order_id,product_id,product_name,region,visitors,customers,orders,revenue\n"
+GOOD_ROW = "2024-03-01,ORD-1,P001,Laptop Pro,North,100,2,3,3900.00\n"
+BAD_ROW = "2024-03-02,ORD-2,P001,Laptop Pro,Atlantis,100,2,3,3900.00\n"
+
+
+def write_csv(path, rows):
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+def test_rejected_rows_are_quarantined(tmp_path):
+    quarantine = tmp_path / "quarantine.csv"
+    df, report = load_data_with_report(
+        write_csv(tmp_path / "sales.csv", [GOOD_ROW, BAD_ROW]), quarantine_path=str(quarantine)
+    )
+
+    assert list(df["order_id"]) == ["ORD-1"]
+    assert report.violations["unknown_region"] == 1
+    assert report.rows_quarantined == 1
+    sample = pd.read_csv(quarantine)
+    assert list(sample["violations"]) == ["unknown_region"]
+
+
+def test_clean_load_writes_no_sample_and_removes_stale_one(tmp_path):
+    quarantine = tmp_path / "quarantine.csv"
+    load_data_with_report(
+        write_csv(tmp_path / "bad.csv", [GOOD_ROW, BAD_ROW]), quarantine_path=str(quarantine)
+    )
+    assert quarantine.exists()
+
+    _, report = load_data_with_report(
+        write_csv(tmp_path / "good.csv", [GOOD_ROW]), quarantine_path=str(quarantine)
+    )
+    assert report.rows_quarantined == 0
+    assert not quarantine.exists()
+
+
+def test_duplicate_order_ids_are_reported_and_last_row_wins(tmp_path):
+    correction = GOOD_ROW.replace("3900.00", "4100.00")
+    quarantine = tmp_path / "quarantine.csv"
+    df, report = load_data_with_report(
+        write_csv(tmp_path / "sales.csv", [GOOD_ROW, correction]), quarantine_path=str(quarantine)
+    )
+
+    assert list(df["revenue"]) == [4100.00]
+    assert report.violations["duplicate_order_id"] == 1
+    assert report.rows_superseded == 1
+    sample = pd.read_csv(quarantine)
+    assert list(sample["violations"]) == ["duplicate_order_id"]
+    assert list(sample["revenue"]) == [3900.00]